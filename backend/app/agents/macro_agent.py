@@ -1,5 +1,4 @@
 """Macro agent for analyzing macroeconomic indicators."""
-import asyncio
 import aiohttp
 from typing import Dict
 from app.agents.state import AgentState
@@ -226,9 +225,7 @@ async def macro_agent_async(state: AgentState) -> Dict:
         # Get macro indicators using async
         print(f"📊 Macro Agent: Fetching economic indicators with async calls...")
         async with aiohttp.ClientSession() as session:
-            # For now, use the sync version in a thread to maintain compatibility
-            loop = asyncio.get_event_loop()
-            indicators = await loop.run_in_executor(None, macro_service.get_macro_indicators)
+            indicators = await macro_service.get_macro_indicators_async()
             
             # Log the indicators
             vix = indicators.get('vix')
@@ -1,13 +1,36 @@
 """Sentiment analysis agent for news and market sentiment."""
 import asyncio
 import aiohttp
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
 from app.agents.state import AgentState
 from app.services.news_service import news_service
 from app.services.llm_service import get_llm_service
 from app.services.finnhub_service import finnhub_service
 
 
+def _news_date_range(days_back: int = 7) -> Tuple[str, str]:
+    """(from, to) dates, YYYY-MM-DD, matching the 7-day news lookback."""
+    today = date.today()
+    return (today - timedelta(days=days_back)).isoformat(), today.isoformat()
+
+
+def _format_finnhub_news(articles: List[Dict]) -> List[Dict]:
+    """Convert Finnhub /company-news items to the article format the news service returns."""
+    return [
+        {
+            'type': 'news',
+            'title': article.get('headline') or '',
+            'url': article.get('url') or '',
+            'snippet': article.get('summary') or article.get('headline') or '',
+            'publisher': article.get('source') or 'Unknown',
+            'timestamp': datetime.fromtimestamp(article.get('datetime') or datetime.now().timestamp()).isoformat(),
+        }
+        for article in articles
+    ]
+
+
 def sentiment_agent(state: AgentState) -> Dict:
     """
     Sentiment agent that analyzes recent news and extracts market sentiment.
@@ -18,18 +41,22 @@ def sentiment_agent(state: AgentState) -> Dict:
     try:
         print(f"📰 Sentiment Agent: Starting analysis for {symbol}")
 
-        # Fetch Finnhub pre-computed sentiment (fast, no LLM needed)
-        print(f"📊 Sentiment Agent: Fetching Finnhub pre-computed sentiment...")
-        finnhub_data = finnhub_service.get_news_sentiment(symbol)
-
-        # Get company-specific news
-        print(f"🔍 Sentiment Agent: Fetching company-specific news...")
-        company_articles = news_service.get_recent_news(symbol, max_articles=10)
+        # Fetch Finnhub pre-computed sentiment (fast, no LLM needed), company-specific
+        # news and broader market news side by side; they are independent network calls
+        print(f"🔍 Sentiment Agent: Fetching Finnhub sentiment, company news and market news...")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            finnhub_future = pool.submit(finnhub_service.get_news_sentiment, symbol)
+            company_future = pool.submit(news_service.get_recent_news, symbol, max_articles=10)
+            market_future = pool.submit(news_service.get_market_news, max_articles=5)
+            finnhub_data = finnhub_future.result()
+            company_articles = company_future.result()
+            market_articles = market_future.result()
+        if not company_articles:
+            print(f"🔁 Sentiment Agent: No company news, trying Finnhub company news...")
+            company_articles = _format_finnhub_news(
+                finnhub_service.get_company_news(symbol, *_news_date_range(), limit=10) or []
+            )
         print(f"✓ Sentiment Agent: Found {len(company_articles)} company-specific articles")
-        
-        # Get broader market news
-        print(f"🔍 Sentiment Agent: Fetching market news...")
-        market_articles = news_service.get_market_news(max_articles=5)
         print(f"✓ Sentiment Agent: Found {len(market_articles)} market articles")
         
         # Combine all articles
@@ -240,11 +267,10 @@ async def sentiment_agent_async(state: AgentState) -> Dict:
         # Fetch Finnhub pre-computed sentiment in parallel with news
         print(f"🔍 Sentiment Agent: Fetching Finnhub sentiment and news with async calls...")
         async with aiohttp.ClientSession() as session:
-            loop = asyncio.get_event_loop()
             # Fetch Finnhub and news in parallel
-            finnhub_task = loop.run_in_executor(None, finnhub_service.get_news_sentiment, symbol)
-            company_articles_task = loop.run_in_executor(None, news_service.get_recent_news, symbol, 10)
-            market_articles_task = loop.run_in_executor(None, news_service.get_market_news, 5)
+            finnhub_task = finnhub_service.get_news_sentiment_async(symbol)
+            company_articles_task = news_service.get_recent_news_async(symbol, 10)
+            market_articles_task = news_service.get_market_news_async(5)
 
             # Wait for all to complete
             finnhub_data, company_articles, market_articles = await asyncio.gather(
@@ -253,6 +279,12 @@ async def sentiment_agent_async(state: AgentState) -> Dict:
                 market_articles_task
             )
 
+            if not company_articles:
+                print(f"🔁 Sentiment Agent: No company news, trying Finnhub company news...")
+                company_articles = _format_finnhub_news(
+                    await finnhub_service.get_company_news_async(symbol, *_news_date_range(), limit=10) or []
+                )
+
             print(f"✓ Sentiment Agent: Found {len(company_articles)} company-specific articles")
             print(f"✓ Sentiment Agent: Found {len(market_articles)} market articles")
         
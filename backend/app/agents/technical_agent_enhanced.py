@@ -1,13 +1,12 @@
 """Enhanced technical analysis agent with multi-timeframe analysis, pattern recognition, and weighted signals."""
-import aiohttp
 import asyncio
+import heapq
 from typing import Dict, List, Optional
 from app.agents.state import AgentState
 from app.services.stock_data import stock_data_service
 from app.services.signal_service import signal_service, SignalType
 from app.services.pattern_recognition import pattern_service
 from app.services.llm_service import get_llm_service
-import json
 
 
 def technical_agent_enhanced(state: AgentState) -> Dict:
@@ -64,6 +63,7 @@ def technical_agent_enhanced(state: AgentState) -> Dict:
 
             # Detect patterns for this timeframe
             patterns = pattern_service.detect_all_patterns(df, lookback_periods=50)
+            top_patterns = heapq.nlargest(5, patterns, key=lambda p: p.confidence)
 
             # Detect divergences
             rsi_divergences = pattern_service.detect_divergences(df, 'RSI', 30)
@@ -77,7 +77,7 @@ def technical_agent_enhanced(state: AgentState) -> Dict:
                         'signal': p.signal,
                         'description': p.description
                     }
-                    for p in patterns[:5]  # Top 5 patterns
+                    for p in top_patterns  # Top 5 patterns
                 ],
                 'divergences': rsi_divergences + macd_divergences
             }
@@ -210,6 +210,7 @@ async def technical_agent_enhanced_async(state: AgentState) -> Dict:
 
             # Detect patterns for this timeframe
             patterns = pattern_service.detect_all_patterns(df, lookback_periods=50)
+            top_patterns = heapq.nlargest(5, patterns, key=lambda p: p.confidence)
 
             # Detect divergences
             rsi_divergences = pattern_service.detect_divergences(df, 'RSI', 30)
@@ -223,7 +224,7 @@ async def technical_agent_enhanced_async(state: AgentState) -> Dict:
                         'signal': p.signal,
                         'description': p.description
                     }
-                    for p in patterns[:5]  # Top 5 patterns
+                    for p in top_patterns  # Top 5 patterns
                 ],
                 'divergences': rsi_divergences + macd_divergences
             }
@@ -341,16 +342,17 @@ def _interpret_alignment(score: float) -> str:
         return "Divergence - Conflicting timeframes"
 
 
+# Map investment styles to preferred timeframes
+_STYLE_PREFERENCES = {
+    "conservative": ("monthly", "weekly", "daily"),
+    "balanced": ("weekly", "daily", "4hour"),
+    "aggressive": ("daily", "4hour", "1hour"),
+}
+
+
 def _get_recommended_timeframe(all_signals: Dict, investment_style: str) -> str:
     """Recommend the best timeframe based on signals and investment style."""
-    # Map investment styles to preferred timeframes
-    style_preferences = {
-        "conservative": ["monthly", "weekly", "daily"],
-        "balanced": ["weekly", "daily", "4hour"],
-        "aggressive": ["daily", "4hour", "1hour"]
-    }
-
-    preferred_tfs = style_preferences.get(investment_style.lower(), ["daily", "weekly"])
+    preferred_tfs = _STYLE_PREFERENCES.get(investment_style.lower(), ("daily", "weekly"))
 
     # Find the timeframe with highest confidence that matches preferences
     best_tf = None
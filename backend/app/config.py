@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     gemini_api_key: Optional[str] = None
     news_api_key: Optional[str] = None
     alpha_vantage_api_key: Optional[str] = None
+    fred_api_key: Optional[str] = None  # FRED is skipped unless a real key is set
     finnhub_api_key: Optional[str] = None  # Finnhub API for market data and sentiment
     
     # AWS-style credentials (if needed)
@@ -40,6 +41,9 @@ class Settings(BaseSettings):
     # API Configuration
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    agent_pool_workers: int = 32  # Threads shared by blocking agent/service calls
+    log_level: str = "INFO"  # Level for the app.* loggers; DEBUG shows per-agent progress
+    cache_dir: str = ".cache"  # On-disk cache for Finnhub, NewsAPI and macro API responses
     
     model_config = SettingsConfigDict(
         env_file=".env",
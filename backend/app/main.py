@@ -1,10 +1,20 @@
 """FastAPI main application."""
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict
+from fastapi.responses import ORJSONResponse
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import asyncio
+import functools
+import hashlib
+import logging
+import logging.handlers
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import pandas as pd
+from itertools import chain
+import orjson
 
 from app.config import settings
 from app.models import (
@@ -19,12 +29,18 @@ from app.agents.macro_agent import macro_agent, macro_agent_async
 from app.agents.decision_agent import decision_agent
 from app.agents.state import AgentState
 from app.services.stock_data import stock_data_service
+from app.services.macro_service import macro_service
+from app.services.finnhub_service import finnhub_service
+from app.services.news_service import news_service
+
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Stock Research & Prediction API",
     description="Multi-agent stock analysis with AI-powered recommendations",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS configuration
@@ -37,15 +53,227 @@ app.add_middleware(
 )
 
 
+# Ticker symbols look like AAPL, BRK.B or RDS-A; anything else is rejected before any agent runs
+_SYMBOL_RE = re.compile(r"^[A-Za-z][A-Za-z0-9.\-]{0,9}$")
+
+# History periods accepted by the chart-data endpoint (yfinance periods plus day counts)
+CHART_PERIODS = {"1d", "5d", "30d", "60d", "90d", "180d", "1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max"}
+
+# Chart-data responses cached per (symbol, period) as (fetched_at, encoded body, ETag);
+# long histories change slowly
+CHART_CACHE_TTL = 60  # seconds
+CHART_CACHE_LONG_TTL = 15 * 60  # seconds
+CHART_CACHE_MAX_ENTRIES = 1024
+LONG_CHART_PERIODS = {"1y", "2y", "5y", "10y", "max"}
+_chart_cache: Dict[Tuple[str, str], Tuple[float, bytes, str]] = {}
+
+
+class _SharedAnalysis:
+    """
+    One workflow run streamed to every connection that asked for it.
+
+    The run lives in its own task, so it does not depend on any one client staying
+    connected. Published frames are kept so that a connection joining late first
+    gets everything it missed, batched into a single frame.
+    """
+
+    def __init__(self) -> None:
+        self.task: Optional[asyncio.Task] = None
+        self.frames: List[str] = []
+        self.subscribers: Set[asyncio.Queue] = set()
+
+    def publish(self, frame: str) -> None:
+        self.frames.append(frame)
+        for subscriber in self.subscribers:
+            subscriber.put_nowait(frame)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Return a queue of frames for one connection; None marks the end of the run."""
+        subscriber: asyncio.Queue = asyncio.Queue()
+        if self.frames:
+            # Array frames are flattened so the replay stays a flat list of updates
+            subscriber.put_nowait("[" + ",".join(
+                frame[1:-1] if frame.startswith("[") else frame for frame in self.frames
+            ) + "]")
+        if self.task.done():
+            subscriber.put_nowait(None)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+
+# Analyses currently running, keyed by (symbol, style); identical requests share one run
+_inflight_analyses: Dict[Tuple[str, str], _SharedAnalysis] = {}
+
+# Encoded final frames of recent successful analyses, keyed by (symbol, style)
+RESULT_CACHE_TTL = 5 * 60  # seconds
+RESULT_CACHE_MAX_ENTRIES = 256
+_result_cache: Dict[Tuple[str, str], Tuple[float, str]] = {}
+
+# Initial streaming-analysis state; copied per connection and filled with symbol/style
+_DEFAULT_STATE: Dict = {
+    "company_info": "",
+    "financial_data": {},
+    "research_sources": [],
+    "technical_signals": {},
+    "chart_data": {},
+    "technical_indicators": {},
+    "news_summary": "",
+    "sentiment_score": 0.0,
+    "news_sources": [],
+    "macro_summary": "",
+    "macro_indicators": {},
+    "macro_risk_level": "medium",
+    "ai_recommendation": "HOLD",
+    "ai_confidence": 0.5,
+    "ai_horizon": "Medium-term",
+    "ai_key_reasons": [],
+    "ai_reasoning": "",
+    "ai_macro_impact": "",
+    "ai_weights": {},
+    "ai_technical_signals": {},
+    "ai_entry_price": None,
+    "ai_targets": None,
+    "ai_stop_loss": None,
+    "user_recommendation": "HOLD",
+    "user_confidence": 0.5,
+    "user_horizon": "Medium-term",
+    "user_key_reasons": [],
+    "user_reasoning": "",
+    "user_macro_impact": "",
+    "user_weights": {},
+    "user_technical_signals": {},
+    "user_entry_price": None,
+    "user_targets": None,
+    "user_stop_loss": None,
+    "comparison_insight": "",
+}
+
+# Neutral recommendations used when the decision agent fails
+_DECISION_FALLBACK: Dict = {
+    "ai_recommendation": "HOLD",
+    "ai_confidence": 0.5,
+    "ai_horizon": "Medium-term",
+    "ai_key_reasons": ["Analysis incomplete due to technical error"],
+    "ai_reasoning": "Unable to generate recommendation due to system error",
+    "ai_macro_impact": "",
+    "ai_weights": {"fundamental": 0.25, "technical": 0.25, "sentiment": 0.25, "macro": 0.25},
+    "ai_technical_signals": {},
+    "ai_entry_price": None,
+    "ai_targets": None,
+    "ai_stop_loss": None,
+    "user_recommendation": "HOLD",
+    "user_confidence": 0.5,
+    "user_horizon": "Medium-term",
+    "user_key_reasons": ["Analysis incomplete due to technical error"],
+    "user_reasoning": "Unable to generate recommendation due to system error",
+    "user_macro_impact": "",
+    "user_weights": {"fundamental": 0.25, "technical": 0.25, "sentiment": 0.25, "macro": 0.25},
+    "user_technical_signals": {},
+    "user_entry_price": None,
+    "user_targets": None,
+    "user_stop_loss": None,
+    "comparison_insight": "Both AI and user recommendations are unavailable due to system error",
+}
+
+# Agents that run concurrently before the decision agent
+PARALLEL_AGENTS = ("research", "technical", "sentiment", "macro")
+
+
+def _status_frame(agent: str, status: str, message: str) -> str:
+    """Pre-encode a constant agent status frame."""
+    return orjson.dumps({"agent": agent, "status": status, "message": message}).decode()
+
+
+# Progress frames that never change between connections, encoded once at import
+STATUS_FRAMES: Dict[tuple, str] = {
+    **{
+        (agent, "in_progress"): _status_frame(agent, "in_progress", f"Starting {agent} analysis...")
+        for agent in PARALLEL_AGENTS
+    },
+    **{
+        (agent, "completed"): _status_frame(agent, "completed", f"{agent.title()} analysis complete")
+        for agent in PARALLEL_AGENTS
+    },
+    ("decision", "in_progress"): _status_frame("decision", "in_progress", "Generating recommendations..."),
+    ("decision", "completed"): _status_frame("decision", "completed", "Recommendations complete"),
+}
+
+# Status frames that are always sent back-to-back go out as one JSON-array frame
+PARALLEL_START_FRAME = "[" + ",".join(STATUS_FRAMES[(agent, "in_progress")] for agent in PARALLEL_AGENTS) + "]"
+ALL_COMPLETED_FRAME = "[" + ",".join(
+    STATUS_FRAMES[(agent, "completed")] for agent in (*PARALLEL_AGENTS, "decision")
+) + "]"
+
+
+# Envelope of the final result frame; the serialized result is appended as "data"
+FINAL_FRAME_PREFIX = '{"agent":"system","status":"completed","message":"Analysis complete","data":'
+
+
+async def send_json_fast(websocket: WebSocket, payload: Dict) -> None:
+    """
+    Serialize a payload with orjson and send it as a text frame.
+
+    orjson handles NumPy scalars natively and writes NaN as null, so chart
+    data can be sent without a separate cleanup pass. Non-string keys (e.g.
+    dates or ints from pandas-derived dicts) are stringified like json.dumps.
+    """
+    data = orjson.dumps(
+        payload,
+        default=str,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+    await websocket.send_text(data.decode())
+
+
+def _configure_logging() -> logging.handlers.QueueListener:
+    """
+    Send application log records through a queue.
+
+    Handlers only enqueue records; formatting and stream I/O happen on the
+    listener's thread, off the event loop.
+    """
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.log_level.upper())
+    app_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    app_logger.propagate = False
+
+    listener.start()
+    return listener
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Validate configuration on startup."""
+    """Install the agent thread pool and queued logging, then validate configuration."""
+    # asyncio.to_thread/run_in_executor(None, ...) all land on this bounded pool
+    app.state.agent_pool = ThreadPoolExecutor(
+        max_workers=settings.agent_pool_workers,
+        thread_name_prefix="agent",
+    )
+    asyncio.get_running_loop().set_default_executor(app.state.agent_pool)
+
+    app.state.log_listener = _configure_logging()
+
     try:
         settings.validate_llm_config()
-        print(f"✓ LLM configured: {settings.default_llm_provider}")
-        print(f"✓ API server starting on {settings.api_host}:{settings.api_port}")
+        logger.info(
+            "✓ LLM configured: %s; API server starting on %s:%s",
+            settings.default_llm_provider, settings.api_host, settings.api_port,
+        )
     except ValueError as e:
-        print(f"⚠ Configuration warning: {e}")
+        logger.warning("⚠ Configuration warning: %s", e)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Drain the agent thread pool, close pooled HTTP clients and flush queued log records."""
+    await asyncio.gather(macro_service.aclose(), finnhub_service.aclose(), news_service.aclose())
+    app.state.agent_pool.shutdown(wait=True)
+    app.state.log_listener.stop()
 
 
 @app.get("/")
@@ -72,6 +300,9 @@ async def analyze_stock(request: StockRequest):
     This endpoint runs the full multi-agent workflow synchronously.
     For real-time progress updates, use the WebSocket endpoint instead.
     """
+    if not _SYMBOL_RE.fullmatch(request.symbol):
+        raise HTTPException(status_code=400, detail=f"Invalid symbol: {request.symbol}")
+
     try:
         # Initialize state
         state = {
@@ -79,8 +310,8 @@ async def analyze_stock(request: StockRequest):
             "investment_style": request.investment_style.value,
         }
         
-        # Run the workflow
-        result = analysis_workflow.invoke(state)
+        # Run the workflow on a worker thread so the event loop keeps serving other requests
+        result = await asyncio.to_thread(analysis_workflow.invoke, state)
         
         # Build response
         return build_analysis_result(result)
@@ -96,339 +327,72 @@ async def analyze_stream(websocket: WebSocket, symbol: str, style: str = "balanc
 
     Sends updates as each agent completes its analysis.
     """
+    inflight_key = (symbol.upper(), style)
     try:
-        print(f"🔄 WebSocket: Accepting connection for {symbol}")
+        logger.debug("🔄 WebSocket: Accepting connection for %s", symbol)
         await websocket.accept()
-        print(f"✅ WebSocket: Connection accepted for {symbol}")
+        logger.debug("✅ WebSocket: Connection accepted for %s", symbol)
+
+        if not _SYMBOL_RE.fullmatch(symbol):
+            logger.warning("⚠️ WebSocket: Rejecting invalid symbol %r", symbol)
+            await send_json_fast(websocket, {
+                "agent": "system",
+                "status": "failed",
+                "message": f"Invalid symbol: {symbol}",
+            })
+            await websocket.close(code=1008, reason="Invalid symbol")
+            return
 
         try:
-            print(f"🔄 WebSocket: Starting analysis for {symbol}")
-
-            # Initialize state
-            state: AgentState = {
-                "symbol": symbol.upper(),
-                "investment_style": style,
-                # Initialize all required fields with defaults
-                "company_info": "",
-                "financial_data": {},
-                "research_sources": [],
-                "technical_signals": {},
-                "chart_data": {},
-                "technical_indicators": {},
-                "news_summary": "",
-                "sentiment_score": 0.0,
-                "news_sources": [],
-                "macro_summary": "",
-                "macro_indicators": {},
-                "macro_risk_level": "medium",
-                "ai_recommendation": "HOLD",
-                "ai_confidence": 0.5,
-                "ai_horizon": "Medium-term",
-                "ai_key_reasons": [],
-                "ai_reasoning": "",
-                "ai_macro_impact": "",
-                "ai_weights": {},
-                "ai_technical_signals": {},
-                "ai_entry_price": None,
-                "ai_targets": None,
-                "ai_stop_loss": None,
-                "user_recommendation": "HOLD",
-                "user_confidence": 0.5,
-                "user_horizon": "Medium-term",
-                "user_key_reasons": [],
-                "user_reasoning": "",
-                "user_macro_impact": "",
-                "user_weights": {},
-                "user_technical_signals": {},
-                "user_entry_price": None,
-                "user_targets": None,
-                "user_stop_loss": None,
-                "comparison_insight": "",
-            }
+            logger.debug("🔄 WebSocket: Starting analysis for %s", symbol)
+
+            # Initialize state; the template's nested defaults are only ever replaced, never mutated
+            state: AgentState = {**_DEFAULT_STATE, "symbol": symbol.upper(), "investment_style": style}
 
         except Exception as e:
-            print(f"❌ WebSocket ERROR: State initialization failed for {symbol}: {str(e)}")
-            import traceback
-            print(f"❌ WebSocket FULL TRACEBACK: {traceback.format_exc()}")
+            logger.exception("❌ WebSocket ERROR: State initialization failed for %s: %s", symbol, e)
             return
 
         # Send initial update
         try:
-            await websocket.send_json({
+            await send_json_fast(websocket, {
                 "agent": "system",
                 "status": "started",
                 "message": f"Starting analysis for {symbol}",
             })
         except Exception as e:
-            print(f"❌ WebSocket ERROR: Failed to send initial update - {str(e)}")
+            logger.error("❌ WebSocket ERROR: Failed to send initial update - %s", e)
             return
 
-        # Run workflow with real-time progress updates
-        try:
-            print(f"🔄 Starting parallel workflow execution for {symbol}")
-
-            # Send initial "in_progress" for all parallel agents
-            parallel_agents = ["research", "technical", "sentiment", "macro"]
-            for agent_name in parallel_agents:
-                try:
-                    await websocket.send_json({
-                        "agent": agent_name,
-                        "status": "in_progress",
-                        "message": f"Starting {agent_name} analysis...",
-                    })
-                except Exception as e:
-                    print(f"❌ WebSocket ERROR: Failed to send {agent_name} start - {str(e)}")
-                    return
-
-            # Execute 4 agents in parallel using asyncio.gather
-            print(f"🚀 Executing parallel agents: {', '.join(parallel_agents)}")
-            results = await asyncio.gather(
-                research_agent_async(state),
-                technical_agent_async(state),
-                sentiment_agent_async(state),
-                macro_agent_async(state),
-                return_exceptions=True  # Continue if one fails
-            )
-
-            # Process results and send completion messages
-            failed_agents = []
-            for i, (agent_name, result) in enumerate(zip(parallel_agents, results)):
-                if isinstance(result, Exception):
-                    print(f"❌ {agent_name.title()} Agent ERROR: {str(result)}")
-                    failed_agents.append(agent_name)
-                    try:
-                        await websocket.send_json({
-                            "agent": agent_name,
-                            "status": "failed",
-                            "message": f"{agent_name} failed: {str(result)}",
-                        })
-                    except Exception as e:
-                        print(f"❌ WebSocket ERROR: Failed to send {agent_name} failure - {str(e)}")
-                else:
-                    state.update(result)
-                    print(f"✅ {agent_name.title()} agent completed for {symbol}")
-                    try:
-                        await websocket.send_json({
-                            "agent": agent_name,
-                            "status": "completed",
-                            "message": f"{agent_name.title()} analysis complete",
-                        })
-                    except Exception as e:
-                        print(f"❌ WebSocket ERROR: Failed to send {agent_name} completion - {str(e)}")
-            
-            # If critical agents failed, provide default values
-            if "technical" in failed_agents:
-                print(f"⚠️ Technical agent failed, providing default technical indicators")
-                
-                # Try to get current price even if technical analysis failed
-                current_price = 0.0
-                try:
-                    import yfinance as yf
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    current_price = info.get('currentPrice', info.get('regularMarketPrice', 0.0))
-                    if current_price == 0:
-                        current_price = info.get('previousClose', 0.0)
-                    print(f"✓ Retrieved current price: ${current_price:.2f}")
-                except Exception as e:
-                    print(f"⚠️ Could not retrieve current price: {str(e)}")
-                    # Try one more fallback - get from historical data
-                    try:
-                        hist = ticker.history(period="1d")
-                        if not hist.empty:
-                            current_price = float(hist['Close'].iloc[-1])
-                            print(f"✓ Retrieved current price from history: ${current_price:.2f}")
-                    except Exception as e2:
-                        print(f"⚠️ Could not retrieve current price from history: {str(e2)}")
-                
-                state["technical_indicators"] = {
-                    "price": current_price,
-                    "sma_20": 0.0,
-                    "sma_50": 0.0,
-                    "sma_200": 0.0,
-                    "ema_12": 0.0,
-                    "ema_26": 0.0,
-                    "rsi": 50.0,
-                    "macd": 0.0,
-                    "macd_signal": 0.0,
-                    "macd_histogram": 0.0,
-                    "bb_upper": 0.0,
-                    "bb_middle": 0.0,
-                    "bb_lower": 0.0,
-                    "volume": 0,
-                    "volume_avg": 0,
-                    "atr": 0.0,
-                }
-                state["technical_signals"] = {"overall": "N/A", "trend": "N/A", "momentum": "N/A", "volume": "N/A"}
-                state["chart_data"] = {}
-            
-            if "research" in failed_agents:
-                print(f"⚠️ Research agent failed, providing default research data")
-                state["company_info"] = "Research data unavailable"
-                state["financial_data"] = {}
-                state["research_sources"] = []
-            
-            if "sentiment" in failed_agents:
-                print(f"⚠️ Sentiment agent failed, providing default sentiment data")
-                state["news_summary"] = "Sentiment analysis unavailable"
-                state["sentiment_score"] = 0.0
-                state["news_sources"] = []
-            
-            if "macro" in failed_agents:
-                print(f"⚠️ Macro agent failed, providing default macro data")
-                state["macro_summary"] = "Macro analysis unavailable"
-                state["macro_indicators"] = {}
-                state["macro_risk_level"] = "medium"
+        # Replay a recent identical analysis instead of running the agents again
+        cached = _result_cache.get(inflight_key)
+        if cached and time.monotonic() - cached[0] < RESULT_CACHE_TTL:
+            logger.info("♻️ WebSocket: Serving cached analysis for %s", symbol)
+            await websocket.send_text(ALL_COMPLETED_FRAME)
+            await websocket.send_text(cached[1])
+            return
 
-            # Send decision agent start
-            try:
-                await websocket.send_json({
-                    "agent": "decision",
-                    "status": "in_progress",
-                    "message": "Generating recommendations...",
-                })
-                await asyncio.sleep(0.1)  # Small delay to ensure message is sent
-            except Exception as e:
-                print(f"❌ WebSocket ERROR: Failed to send decision start - {str(e)}")
-                return
-
-            # Execute decision agent
-            try:
-                print(f"🎯 Executing decision agent...")
-                decision_result = decision_agent(state)
-                state.update(decision_result)
-                print(f"✅ Decision agent completed for {symbol}")
-            except Exception as e:
-                print(f"❌ Decision Agent ERROR: {str(e)}")
-                await websocket.send_json({
-                    "agent": "decision",
-                    "status": "failed",
-                    "message": f"Decision analysis failed: {str(e)}",
-                })
-                
-                # Provide fallback values for decision agent failure
-                print(f"⚠️ Decision agent failed, providing default recommendations")
-                state.update({
-                    "ai_recommendation": "HOLD",
-                    "ai_confidence": 0.5,
-                    "ai_horizon": "Medium-term",
-                    "ai_key_reasons": ["Analysis incomplete due to technical error"],
-                    "ai_reasoning": "Unable to generate recommendation due to system error",
-                    "ai_macro_impact": "",
-                    "ai_weights": {"fundamental": 0.25, "technical": 0.25, "sentiment": 0.25, "macro": 0.25},
-                    "ai_technical_signals": {},
-                    "ai_entry_price": None,
-                    "ai_targets": None,
-                    "ai_stop_loss": None,
-                    "user_recommendation": "HOLD",
-                    "user_confidence": 0.5,
-                    "user_horizon": "Medium-term",
-                    "user_key_reasons": ["Analysis incomplete due to technical error"],
-                    "user_reasoning": "Unable to generate recommendation due to system error",
-                    "user_macro_impact": "",
-                    "user_weights": {"fundamental": 0.25, "technical": 0.25, "sentiment": 0.25, "macro": 0.25},
-                    "user_technical_signals": {},
-                    "user_entry_price": None,
-                    "user_targets": None,
-                    "user_stop_loss": None,
-                    "comparison_insight": "Both AI and user recommendations are unavailable due to system error",
-                })
-
-            # Send decision completion
-            try:
-                await websocket.send_json({
-                    "agent": "decision",
-                    "status": "completed",
-                    "message": "Recommendations complete",
-                })
-                await asyncio.sleep(0.1)  # Small delay to ensure message is sent
-            except Exception as e:
-                print(f"❌ WebSocket ERROR: Failed to send decision completion - {str(e)}")
-                return
-
-            print(f"✅ Workflow completed successfully for {symbol}")
-
-            # Send final result
-            try:
-                final_result = build_analysis_result(state)
-                
-                # Convert to dict and handle any serialization issues
-                result_dict = final_result.dict()
-                
-                # Clean chart_data to ensure JSON serialization
-                if 'chart_data' in result_dict and result_dict['chart_data']:
-                    chart_data = result_dict['chart_data']
-                    # Convert any NaN values to None for JSON serialization
-                    for key, value in chart_data.items():
-                        if isinstance(value, list):
-                            chart_data[key] = [None if pd.isna(v) else v for v in value]
-                
-                await websocket.send_json({
-                    "agent": "system",
-                    "status": "completed",
-                    "message": "Analysis complete",
-                    "data": result_dict,
-                })
-                print(f"📨 Final result sent for {symbol}")
-            except Exception as e:
-                print(f"❌ WebSocket ERROR: Failed to send final result - {str(e)}")
-                import traceback
-                print(f"❌ WebSocket SERIALIZATION TRACEBACK: {traceback.format_exc()}")
-                
-                # Try to send a simplified result without chart_data
-                try:
-                    simplified_result = {
-                        "symbol": state.get("symbol", symbol),
-                        "current_price": state.get("technical_indicators", {}).get("price", 0),
-                        "error": "Chart data serialization failed, but analysis completed"
-                    }
-                    await websocket.send_json({
-                        "agent": "system",
-                        "status": "completed",
-                        "message": "Analysis complete (simplified result due to serialization issue)",
-                        "data": simplified_result,
-                    })
-                    print(f"📨 Simplified result sent for {symbol}")
-                except Exception as fallback_error:
-                    print(f"❌ WebSocket ERROR: Even simplified result failed - {str(fallback_error)}")
-
-            # Keep connection open briefly to ensure frontend receives all messages
-            await asyncio.sleep(0.5)
-            print(f"🔄 Keeping WebSocket open for {symbol} to ensure message delivery")
-
-        except Exception as workflow_error:
-            print(f"❌ Workflow ERROR for {symbol}: {str(workflow_error)}")
-            import traceback
-            print(f"❌ Workflow FULL TRACEBACK: {traceback.format_exc()}")
-            # Send error notification to frontend
-            try:
-                await websocket.send_json({
-                    "agent": "system",
-                    "status": "failed",
-                    "message": f"Analysis failed: {str(workflow_error)}",
-                })
-            except Exception as e:
-                print(f"❌ WebSocket ERROR: Failed to send error notification - {str(e)}")
+        # Share the run with an identical analysis that is already in flight
+        analysis = _inflight_analyses.get(inflight_key)
+        if analysis is None or analysis.task.cancelling():
+            analysis = _start_analysis(inflight_key, state)
+        else:
+            logger.info("🔁 WebSocket: Joining in-flight analysis for %s", symbol)
 
-        except Exception as e:
-            print(f"❌ WebSocket ERROR: Workflow failed for {symbol}: {str(e)}")
-            import traceback
-            print(f"❌ WebSocket FULL TRACEBACK: {traceback.format_exc()}")
+        await _stream_analysis(websocket, symbol, analysis)
 
     except WebSocketDisconnect:
-        print(f"🔌 WebSocket disconnected for {symbol}")
+        logger.info("🔌 WebSocket disconnected for %s", symbol)
     except Exception as e:
-        print(f"❌ WebSocket ERROR for {symbol}: {str(e)}")
-        import traceback
-        print(f"❌ WebSocket FULL TRACEBACK: {traceback.format_exc()}")
+        logger.exception("❌ WebSocket ERROR for %s: %s", symbol, e)
         try:
-            await websocket.send_json({
+            await send_json_fast(websocket, {
                 "agent": "system",
                 "status": "failed",
                 "message": f"WebSocket error: {str(e)}",
             })
         except Exception as send_error:
-            print(f"❌ WebSocket ERROR: Failed to send error notification - {str(send_error)}")
+            logger.error("❌ WebSocket ERROR: Failed to send error notification - %s", send_error)
         finally:
             try:
                 await websocket.close()
@@ -436,11 +400,9 @@ async def analyze_stream(websocket: WebSocket, symbol: str, style: str = "balanc
                 pass  # Already closed
 
     except Exception as e:
-        print(f"❌ WEBSOCKET HANDLER ERROR for {symbol}: {str(e)}")
-        import traceback
-        print(f"❌ WEBSOCKET HANDLER FULL TRACEBACK: {traceback.format_exc()}")
+        logger.exception("❌ WEBSOCKET HANDLER ERROR for %s: %s", symbol, e)
         try:
-            await websocket.send_json({
+            await send_json_fast(websocket, {
                 "agent": "system",
                 "status": "failed",
                 "message": f"Handler error: {str(e)}",
@@ -454,87 +416,386 @@ async def analyze_stream(websocket: WebSocket, symbol: str, style: str = "balanc
                 pass
 
 
+def _failed_frame(agent_name: str, error: BaseException) -> str:
+    """Encode the status frame reporting that an agent failed."""
+    return orjson.dumps({
+        "agent": agent_name,
+        "status": "failed",
+        "message": f"{agent_name} failed: {str(error)}",
+    }).decode()
+
+
+async def _run_analysis(state: Dict, publish: Callable[[str], None]) -> Tuple[Dict, Optional[str]]:
+    """
+    Run the agent workflow for one analysis, publishing progress frames as it goes.
+
+    Returns the final state and its encoded result frame (None if encoding failed).
+    """
+    symbol = state["symbol"]
+    try:
+        logger.debug("🔄 Starting parallel workflow execution for %s", symbol)
+
+        # Publish the initial "in_progress" for all parallel agents as a single frame
+        publish(PARALLEL_START_FRAME)
+
+        # Execute 4 agents in parallel, reporting each one as soon as it finishes
+        logger.debug("🚀 Executing parallel agents: %s", ', '.join(PARALLEL_AGENTS))
+        agent_tasks = {
+            asyncio.create_task(research_agent_async(state)): "research",
+            asyncio.create_task(technical_agent_async(state)): "technical",
+            asyncio.create_task(sentiment_agent_async(state)): "sentiment",
+            asyncio.create_task(macro_agent_async(state)): "macro",
+        }
+
+        # Process results and publish completion messages
+        failed_agents = []
+        try:
+            async for task in asyncio.as_completed(agent_tasks):
+                agent_name = agent_tasks[task]
+                error = task.exception()
+                if error is not None:
+                    logger.error("❌ %s Agent ERROR: %s", agent_name.title(), error)
+                    failed_agents.append(agent_name)
+                    publish(_failed_frame(agent_name, error))
+                else:
+                    state.update(task.result())
+                    logger.debug("✅ %s agent completed for %s", agent_name.title(), symbol)
+                    publish(STATUS_FRAMES[(agent_name, "completed")])
+        finally:
+            # If the run is cancelled (every client gone), don't leave the agents orphaned
+            for task in agent_tasks:
+                task.cancel()
+        
+        # If critical agents failed, provide default values
+        if "technical" in failed_agents:
+            logger.warning("⚠️ Technical agent failed, providing default technical indicators")
+            
+            # Keep the last price served for this symbol, even if expired; asking the
+            # data source again would likely fail the same way the agent just did
+            current_price = _last_known_price(state["symbol"])
+            if current_price:
+                logger.debug("✓ Using last known price: $%.2f", current_price)
+            else:
+                logger.warning("⚠️ No cached price for %s", symbol)
+                current_price = 0.0
+            
+            state["technical_indicators"] = {
+                "price": current_price,
+                "sma_20": 0.0,
+                "sma_50": 0.0,
+                "sma_200": 0.0,
+                "ema_12": 0.0,
+                "ema_26": 0.0,
+                "rsi": 50.0,
+                "macd": 0.0,
+                "macd_signal": 0.0,
+                "macd_histogram": 0.0,
+                "bb_upper": 0.0,
+                "bb_middle": 0.0,
+                "bb_lower": 0.0,
+                "volume": 0,
+                "volume_avg": 0,
+                "atr": 0.0,
+            }
+            state["technical_signals"] = {"overall": "N/A", "trend": "N/A", "momentum": "N/A", "volume": "N/A"}
+            state["chart_data"] = {}
+        
+        if "research" in failed_agents:
+            logger.warning("⚠️ Research agent failed, providing default research data")
+            state["company_info"] = "Research data unavailable"
+            state["financial_data"] = {}
+            state["research_sources"] = []
+        
+        if "sentiment" in failed_agents:
+            logger.warning("⚠️ Sentiment agent failed, providing default sentiment data")
+            state["news_summary"] = "Sentiment analysis unavailable"
+            state["sentiment_score"] = 0.0
+            state["news_sources"] = []
+        
+        if "macro" in failed_agents:
+            logger.warning("⚠️ Macro agent failed, providing default macro data")
+            state["macro_summary"] = "Macro analysis unavailable"
+            state["macro_indicators"] = {}
+            state["macro_risk_level"] = "medium"
+
+        # Execute decision agent
+        logger.debug("🎯 Executing decision agent...")
+        if not await _run_step(publish, "decision", decision_agent, state):
+            # Provide fallback values for decision agent failure
+            logger.warning("⚠️ Decision agent failed, providing default recommendations")
+            failed_agents.append("decision")
+            state.update(_DECISION_FALLBACK)
+            # As before, the step still settles as completed once the fallback is in place
+            publish(STATUS_FRAMES[("decision", "completed")])
+
+        # Encode once for every connection streaming this run and the replay cache
+        frame = _encode_final_frame(state)
+        if frame is not None and not failed_agents:
+            _cache_result((symbol, state["investment_style"]), frame)
+
+        logger.info("✅ Workflow completed successfully for %s", symbol)
+        return state, frame
+
+    except Exception as workflow_error:
+        logger.exception("❌ Workflow ERROR for %s: %s", symbol, workflow_error)
+        raise
+
+
+async def _run_step(publish: Callable[[str], None], agent_name: str, agent_fn, state: Dict) -> bool:
+    """
+    Run a synchronous agent on the thread pool and publish its status frames.
+
+    Publishes in_progress, then completed or failed. On success the agent's output is
+    merged into state. Returns False if the agent raised.
+    """
+    publish(STATUS_FRAMES[(agent_name, "in_progress")])
+    try:
+        delta = await asyncio.to_thread(agent_fn, state)
+    except Exception as e:
+        logger.error("❌ %s Agent ERROR: %s", agent_name.title(), e)
+        publish(_failed_frame(agent_name, e))
+        return False
+
+    state.update(delta)
+    logger.debug("✅ %s agent completed for %s", agent_name.title(), state["symbol"])
+    publish(STATUS_FRAMES[(agent_name, "completed")])
+    return True
+
+
+def _encode_final_frame(state: Dict) -> Optional[str]:
+    """Encode the final result frame, or return None if the result cannot be serialized."""
+    try:
+        final_result = build_analysis_result(state)
+
+        # The frontend loads chart series from /api/stock/{symbol}/chart-data, so the
+        # (by far largest) chart_data arrays are left out of the WebSocket payload
+        final_result = final_result.model_copy(update={"chart_data": {}})
+
+        # Encode straight to JSON in pydantic-core, skipping the intermediate dict
+        return f"{FINAL_FRAME_PREFIX}{final_result.model_dump_json()}}}"
+    except Exception as e:
+        logger.exception("❌ WebSocket ERROR: Failed to encode final result - %s", e)
+        return None
+
+
+def _last_known_price(symbol: str) -> Optional[float]:
+    """Newest price for symbol from the chart-data or result caches, ignoring their TTLs."""
+    chart_entries = [entry for key, entry in _chart_cache.items() if key[0] == symbol]
+    if chart_entries:
+        return orjson.loads(max(chart_entries)[1]).get("current_price")
+
+    result_entries = [entry for key, entry in _result_cache.items() if key[0] == symbol]
+    if result_entries:
+        return orjson.loads(max(result_entries)[1])["data"].get("current_price")
+    return None
+
+
+def _cache_result(key: Tuple[str, str], frame: str) -> None:
+    """Remember an encoded final frame for replay, evicting the oldest entry when full."""
+    if key not in _result_cache and len(_result_cache) >= RESULT_CACHE_MAX_ENTRIES:
+        _result_cache.pop(next(iter(_result_cache)))
+    _result_cache.pop(key, None)
+    _result_cache[key] = (time.monotonic(), frame)
+
+
+async def _send_final_result(websocket: WebSocket, frame: Optional[str], state: Dict, symbol: str) -> None:
+    """Send the encoded final result, falling back to a simplified payload if encoding failed."""
+    if frame is not None:
+        try:
+            await websocket.send_text(frame)
+            logger.debug("📨 Final result sent for %s", symbol)
+        except Exception as e:
+            logger.error("❌ WebSocket ERROR: Failed to send final result - %s", e)
+        return
+
+    # Try to send a simplified result without chart_data
+    try:
+        simplified_result = {
+            "symbol": state.get("symbol", symbol),
+            "current_price": state.get("technical_indicators", {}).get("price", 0),
+            "error": "Chart data serialization failed, but analysis completed"
+        }
+        await send_json_fast(websocket, {
+            "agent": "system",
+            "status": "completed",
+            "message": "Analysis complete (simplified result due to serialization issue)",
+            "data": simplified_result,
+        })
+        logger.info("📨 Simplified result sent for %s", symbol)
+    except Exception as fallback_error:
+        logger.error("❌ WebSocket ERROR: Even simplified result failed - %s", fallback_error)
+
+
+def _start_analysis(key: Tuple[str, str], state: Dict) -> _SharedAnalysis:
+    """Start the workflow in its own task and register it for identical requests to join."""
+    analysis = _SharedAnalysis()
+    analysis.task = asyncio.create_task(_run_analysis(state, analysis.publish))
+    analysis.task.add_done_callback(functools.partial(_analysis_finished, key, analysis))
+    _inflight_analyses[key] = analysis
+    return analysis
+
+
+def _analysis_finished(key: Tuple[str, str], analysis: _SharedAnalysis, task: asyncio.Task) -> None:
+    """Unregister a finished run and wake every connection still streaming it."""
+    if _inflight_analyses.get(key) is analysis:
+        del _inflight_analyses[key]
+    if not task.cancelled():
+        task.exception()  # Already logged by _run_analysis; mark it retrieved
+    for subscriber in analysis.subscribers:
+        subscriber.put_nowait(None)
+
+
+async def _stream_analysis(websocket: WebSocket, symbol: str, analysis: _SharedAnalysis) -> None:
+    """Stream a shared run's progress frames to one connection, then its final result."""
+    frames = analysis.subscribe()
+    try:
+        while (frame := await frames.get()) is not None:
+            await websocket.send_text(frame)
+
+        task = analysis.task
+        if task.cancelled() or task.exception() is not None:
+            error = "cancelled" if task.cancelled() else str(task.exception())
+            await send_json_fast(websocket, {
+                "agent": "system",
+                "status": "failed",
+                "message": f"Analysis failed: {error}",
+            })
+            return
+
+        state, frame = task.result()
+        await _send_final_result(websocket, frame, state, symbol)
+    finally:
+        analysis.subscribers.discard(frames)
+        # Stop the agents only once no connection is waiting for the result any more
+        if not analysis.subscribers and not analysis.task.done():
+            logger.info("🛑 No clients left, cancelling analysis for %s", symbol)
+            analysis.task.cancel()
+
+
 @app.get("/api/stock/{symbol}/chart-data")
-async def get_chart_data(symbol: str, period: str = "90d"):
+async def get_chart_data(request: Request, symbol: str, period: str = "90d"):
     """
     Get historical stock data with technical indicators for charting.
     
+    Responses carry an ETag; a matching If-None-Match gets an empty 304.
+    
     Args:
         symbol: Stock ticker symbol
         period: Time period (e.g., "90d", "1y", "5y")
     """
+    if not _SYMBOL_RE.fullmatch(symbol):
+        raise HTTPException(status_code=400, detail=f"Invalid symbol: {symbol}")
+    if period not in CHART_PERIODS:
+        raise HTTPException(status_code=400, detail=f"Invalid period: {period}")
+
     try:
-        df, indicators = stock_data_service.get_stock_data(symbol, period)
-        chart_data = stock_data_service.get_chart_data(df)
-        
-        return {
-            "symbol": symbol,
-            "period": period,
-            "current_price": indicators['price'],
-            "chart_data": chart_data,
-            "indicators": indicators,
-        }
+        body, etag = await _get_cached_chart_data(symbol.upper(), period)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    ttl = CHART_CACHE_LONG_TTL if period in LONG_CHART_PERIODS else CHART_CACHE_TTL
+    headers = {"ETag": etag, "Cache-Control": f"max-age={ttl}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _get_cached_chart_data(symbol: str, period: str) -> Tuple[bytes, str]:
+    """
+    Return the encoded chart-data body and its ETag, refetching once the entry expires.
+
+    If the refetch fails, the expired entry is served instead.
+    """
+    key = (symbol, period)
+    ttl = CHART_CACHE_LONG_TTL if period in LONG_CHART_PERIODS else CHART_CACHE_TTL
+    now = time.monotonic()
+
+    cached = _chart_cache.get(key)
+    if cached and now - cached[0] < ttl:
+        return cached[1], cached[2]
+
+    try:
+        df, indicators = await asyncio.to_thread(stock_data_service.get_stock_data, symbol, period)
+    except Exception as e:
+        if not cached:
+            raise
+        # Upstream outage: an expired chart beats a 500
+        logger.warning("⚠️ Chart data refresh failed for %s (%s), serving cached data: %s", symbol, period, e)
+        return cached[1], cached[2]
+
+    response = {
+        "symbol": symbol,
+        "period": period,
+        "current_price": indicators['price'],
+        "chart_data": stock_data_service.get_chart_data(df),
+        "indicators": indicators,
+    }
+    body = orjson.dumps(response, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+    if key not in _chart_cache and len(_chart_cache) >= CHART_CACHE_MAX_ENTRIES:
+        # Evict the oldest entry (dicts preserve insertion order)
+        _chart_cache.pop(next(iter(_chart_cache)))
+    _chart_cache.pop(key, None)
+    _chart_cache[key] = (now, body, etag)
+    return body, etag
+
+
+# Recommendation fields keyed by state suffix: (model field, default)
+_REC_FIELDS = {
+    "recommendation": ("action", "HOLD"),
+    "confidence": ("confidence", 0.5),
+    "horizon": ("horizon", "Medium-term"),
+    "key_reasons": ("key_reasons", []),
+    "reasoning": ("reasoning", ""),
+    "macro_impact": ("macro_impact", ""),
+    "weights": ("agent_weights", {}),
+    "technical_signals": ("technical_signals", {}),
+    "entry_price": ("entry_price", None),
+    "targets": ("target_prices", None),
+    "stop_loss": ("stop_loss", None),
+    "entry_price_strategy": ("entry_price_strategy", None),
+    "reassessment_timeline": ("reassessment_timeline", None),
+    "target_strategy": ("target_strategy", None),
+}
+
+
+def _build_recommendation(state: Dict, prefix: str) -> Recommendation:
+    """Build a Recommendation from the "ai_*" or "user_*" fields of the workflow state."""
+    fields = {
+        model_key: state.get(f"{prefix}_{state_key}", default)
+        for state_key, (model_key, default) in _REC_FIELDS.items()
+    }
+    return Recommendation.model_construct(type=prefix.upper(), **fields)
+
 
 def build_analysis_result(state: Dict) -> StockAnalysisResult:
-    """Build StockAnalysisResult from workflow state."""
+    """
+    Build StockAnalysisResult from workflow state.
+    
+    The state is produced by our own agents, so models are built with
+    model_construct and skip validation.
+    """
     
     # Build sources list
-    sources = []
-    for source in state.get("research_sources", []):
-        sources.append(Source(**source))
-    for source in state.get("news_sources", []):
-        sources.append(Source(**source))
+    sources = [
+        Source.model_construct(**source)
+        for source in chain(state.get("research_sources", ()), state.get("news_sources", ()))
+    ]
     
     # Build technical indicators
     indicators_data = state.get("technical_indicators", {})
-    technical_indicators = TechnicalIndicators(**indicators_data)
+    technical_indicators = TechnicalIndicators.model_construct(**indicators_data)
     
     # Build macro indicators
     macro_data = state.get("macro_indicators", {})
-    macro_indicators = MacroIndicators(**macro_data)
+    macro_indicators = MacroIndicators.model_construct(**macro_data)
     
-    # Build AI recommendation
-    ai_recommendation = Recommendation(
-        type="AI",
-        action=state.get("ai_recommendation", "HOLD"),
-        confidence=state.get("ai_confidence", 0.5),
-        horizon=state.get("ai_horizon", "Medium-term"),
-        key_reasons=state.get("ai_key_reasons", []),
-        reasoning=state.get("ai_reasoning", ""),
-        macro_impact=state.get("ai_macro_impact", ""),
-        agent_weights=state.get("ai_weights", {}),
-        technical_signals=state.get("ai_technical_signals", {}),
-        entry_price=state.get("ai_entry_price"),
-        target_prices=state.get("ai_targets"),
-        stop_loss=state.get("ai_stop_loss"),
-        entry_price_strategy=state.get("ai_entry_price_strategy"),
-        reassessment_timeline=state.get("ai_reassessment_timeline"),
-        target_strategy=state.get("ai_target_strategy"),
-    )
-    
-    # Build User recommendation
-    user_recommendation = Recommendation(
-        type="USER",
-        action=state.get("user_recommendation", "HOLD"),
-        confidence=state.get("user_confidence", 0.5),
-        horizon=state.get("user_horizon", "Medium-term"),
-        key_reasons=state.get("user_key_reasons", []),
-        reasoning=state.get("user_reasoning", ""),
-        macro_impact=state.get("user_macro_impact", ""),
-        agent_weights=state.get("user_weights", {}),
-        technical_signals=state.get("user_technical_signals", {}),
-        entry_price=state.get("user_entry_price"),
-        target_prices=state.get("user_targets"),
-        stop_loss=state.get("user_stop_loss"),
-        entry_price_strategy=state.get("user_entry_price_strategy"),
-        reassessment_timeline=state.get("user_reassessment_timeline"),
-        target_strategy=state.get("user_target_strategy"),
-    )
+    # Build AI and User recommendations from their prefixed state fields
+    ai_recommendation = _build_recommendation(state, "ai")
+    user_recommendation = _build_recommendation(state, "user")
     
-    return StockAnalysisResult(
+    return StockAnalysisResult.model_construct(
         symbol=state["symbol"],
         current_price=indicators_data.get("price", 0),
         research_summary=state.get("company_info", ""),
@@ -555,11 +816,16 @@ def build_analysis_result(state: Dict) -> StockAnalysisResult:
 
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
+    # uvloop is not available on Windows; fall back to the default asyncio loop there
     uvicorn.run(
         "app.main:app",
         host=settings.api_host,
         port=settings.api_port,
         reload=True,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets",
     )
 
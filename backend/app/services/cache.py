@@ -0,0 +1,69 @@
+"""Persistent on-disk TTL cache for external API responses."""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+class FileCache:
+    """
+    JSON file cache that survives restarts.
+
+    Each entry is stored as {timestamp, ttl, data} in
+    {cache_dir}/{namespace}/{md5(key)}.json. Expired or unreadable entries
+    are treated as misses.
+    """
+
+    def __init__(self, namespace: str):
+        self.directory = Path(settings.cache_dir) / namespace
+
+    @staticmethod
+    def make_key(endpoint: str, **params) -> str:
+        """Build a cache key from an endpoint and its (non-secret) query parameters."""
+        return endpoint + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.md5(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str, allow_expired: bool = False, max_stale: float = 0) -> Optional[Any]:
+        """
+        Return the cached data for key, or None if missing or expired.
+
+        An entry is also returned up to max_stale seconds past its TTL, or at any
+        age with allow_expired=True, for use as a fallback or while refreshing.
+        """
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+            if not allow_expired and time.time() - entry["timestamp"] > entry["ttl"] + max_stale:
+                return None
+            return entry["data"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Unreadable, truncated or malformed entries count as a miss
+            return None
+
+    def set(self, key: str, data: Any, ttl: float) -> None:
+        """Store JSON-serializable data under key for ttl seconds."""
+        entry = {"timestamp": time.time(), "ttl": ttl, "data": data}
+        tmp_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("⚠️ File cache write failed for %s: %s", self.directory.name, e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
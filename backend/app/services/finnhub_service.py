@@ -5,20 +5,59 @@ This service provides access to Finnhub's pre-computed sentiment scores,
 buzz metrics, and social sentiment data.
 """
 
+import asyncio
+import logging
+import httpx
+import orjson
 import requests
-from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import date, timedelta
+from typing import Dict, List, Optional
 from app.config import settings
+from app.services.cache import FileCache, HOUR
+
+logger = logging.getLogger(__name__)
 
 
 class FinnhubService:
     """Service for interacting with Finnhub API."""
 
     BASE_URL = "https://finnhub.io/api/v1"
+    SENTIMENT_TTL = 1 * HOUR  # Buzz and scores refresh slowly
+    COMPANY_NEWS_TTL = 6 * HOUR
 
     def __init__(self):
         """Initialize Finnhub service."""
         self.api_key = settings.finnhub_api_key
+        # Authenticate via header so the token stays out of URLs, logs and cache keys
+        headers = {"User-Agent": "stock-researcher/1.0"}
+        if self.api_key:
+            headers["X-Finnhub-Token"] = self.api_key
         self.session = requests.Session()
+        self.session.headers.update(headers)
+        # Room for concurrent lookups from parallel analyses, with backoff on rate limits and server errors.
+        # raise_on_status=False hands the final 429 back so it is reported as such.
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries))
+        # Responses persisted across restarts to spare the rate-limited API
+        self.disk_cache = FileCache("finnhub")
+        # Pooled client for the async agents, so lookups don't tie up worker threads
+        self.async_client = httpx.AsyncClient(
+            headers=headers,
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+
+    async def aclose(self):
+        """Close the async HTTP client's pooled connections."""
+        await self.async_client.aclose()
 
     def get_news_sentiment(self, symbol: str) -> Optional[Dict]:
         """
@@ -53,53 +92,104 @@ class FinnhubService:
         }
         """
         if not self.api_key:
-            print("⚠️ Finnhub API key not configured, skipping sentiment fetch")
+            logger.warning("⚠️ Finnhub API key not configured, skipping sentiment fetch")
             return None
 
+        symbol = symbol.upper()
+        cache_key = FileCache.make_key("news-sentiment", symbol=symbol)
+        cached = self.disk_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             url = f"{self.BASE_URL}/news-sentiment"
-            params = {
-                "symbol": symbol.upper(),
-                "token": self.api_key
-            }
+            params = {"symbol": symbol}
 
             response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
 
-            data = response.json()
+            return self._checked_sentiment(symbol, cache_key, orjson.loads(response.content))
 
-            # Validate response has expected fields
-            if "buzz" not in data or "sentiment" not in data:
-                print(f"⚠️ Finnhub returned incomplete data for {symbol}")
-                return None
+        except requests.exceptions.HTTPError as e:
+            self._report_http_error(symbol, e.response.status_code, e)
+            return self._stale_sentiment(cache_key)
 
-            print(f"✅ Finnhub sentiment fetched for {symbol}: "
-                  f"Score={data.get('companyNewsScore', 0):.2f}, "
-                  f"Buzz={data.get('buzz', {}).get('buzz', 0):.2f}")
+        except requests.exceptions.RequestException as e:
+            logger.warning("⚠️ Finnhub request failed for %s: %s", symbol, e)
+            return self._stale_sentiment(cache_key)
 
-            return data
+        except Exception as e:
+            logger.error("❌ Unexpected error fetching Finnhub sentiment for %s: %s", symbol, e)
+            return self._stale_sentiment(cache_key)
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 429:
-                print(f"⚠️ Finnhub rate limit exceeded for {symbol}")
-            elif e.response.status_code == 404:
-                print(f"⚠️ Symbol {symbol} not found in Finnhub")
-            else:
-                print(f"⚠️ Finnhub HTTP error for {symbol}: {e}")
+    async def get_news_sentiment_async(self, symbol: str) -> Optional[Dict]:
+        """Async version of get_news_sentiment using the shared httpx client."""
+        if not self.api_key:
+            logger.warning("⚠️ Finnhub API key not configured, skipping sentiment fetch")
             return None
 
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ Finnhub request failed for {symbol}: {str(e)}")
-            return None
+        symbol = symbol.upper()
+        cache_key = FileCache.make_key("news-sentiment", symbol=symbol)
+        cached = await asyncio.to_thread(self.disk_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await self.async_client.get(
+                f"{self.BASE_URL}/news-sentiment",
+                params={"symbol": symbol},
+            )
+            response.raise_for_status()
+
+            return await asyncio.to_thread(
+                self._checked_sentiment, symbol, cache_key, orjson.loads(response.content)
+            )
+
+        except httpx.HTTPStatusError as e:
+            self._report_http_error(symbol, e.response.status_code, e)
+            return await asyncio.to_thread(self._stale_sentiment, cache_key)
+
+        except httpx.RequestError as e:
+            logger.warning("⚠️ Finnhub request failed for %s: %s", symbol, e)
+            return await asyncio.to_thread(self._stale_sentiment, cache_key)
 
         except Exception as e:
-            print(f"❌ Unexpected error fetching Finnhub sentiment for {symbol}: {str(e)}")
+            logger.error("❌ Unexpected error fetching Finnhub sentiment for %s: %s", symbol, e)
+            return await asyncio.to_thread(self._stale_sentiment, cache_key)
+
+    def _checked_sentiment(self, symbol: str, cache_key: str, data: Dict) -> Optional[Dict]:
+        """Return the sentiment payload if it has the expected fields (caching it), else None."""
+        # Validate response has expected fields
+        if "buzz" not in data or "sentiment" not in data:
+            logger.warning("⚠️ Finnhub returned incomplete data for %s", symbol)
             return None
 
+        logger.debug("✅ Finnhub sentiment fetched for %s: Score=%.2f, Buzz=%.2f",
+                     symbol, data.get('companyNewsScore', 0), data.get('buzz', {}).get('buzz', 0))
+
+        self.disk_cache.set(cache_key, data, self.SENTIMENT_TTL)
+        return data
+
+    def _stale_sentiment(self, cache_key: str) -> Optional[Dict]:
+        """Last cached sentiment even if expired, so a Finnhub outage degrades to old data rather than none."""
+        return self.disk_cache.get(cache_key, allow_expired=True)
+
+    def _report_http_error(self, symbol: str, status_code: int, error: Exception) -> None:
+        """Log a Finnhub HTTP error with a hint for the common status codes."""
+        if status_code == 429:
+            logger.warning("⚠️ Finnhub rate limit exceeded for %s", symbol)
+        elif status_code == 404:
+            logger.warning("⚠️ Symbol %s not found in Finnhub", symbol)
+        else:
+            logger.warning("⚠️ Finnhub HTTP error for %s: %s", symbol, error)
+
     def get_company_news(self, symbol: str, from_date: str, to_date: str, limit: int = 50) -> Optional[list]:
         """
         Fetch company-specific news from Finnhub.
 
+        Queries the most recent part of the range first and widens it only when
+        that yields fewer than `limit` articles.
+
         Args:
             symbol: Stock ticker
             from_date: Start date (YYYY-MM-DD)
@@ -112,25 +202,99 @@ class FinnhubService:
         if not self.api_key:
             return None
 
+        symbol = symbol.upper()
         try:
-            url = f"{self.BASE_URL}/company-news"
-            params = {
-                "symbol": symbol.upper(),
-                "from": from_date,
-                "to": to_date,
-                "token": self.api_key
-            }
+            # Narrowest window first; widen only if it holds fewer than `limit` articles
+            for window_start in self._news_window_starts(from_date, to_date, limit):
+                articles = self._fetch_company_news(symbol, window_start, to_date)
+                if len(articles) >= limit:
+                    break
+            return articles[:limit]
 
-            response = self.session.get(url, params=params, timeout=10)
-            response.raise_for_status()
+        except Exception as e:
+            logger.warning("⚠️ Error fetching Finnhub company news: %s", e)
+            return None
 
-            articles = response.json()
-            return articles[:limit] if articles else []
+    async def get_company_news_async(
+        self, symbol: str, from_date: str, to_date: str, limit: int = 50
+    ) -> Optional[list]:
+        """Async version of get_company_news using the shared httpx client."""
+        if not self.api_key:
+            return None
+
+        symbol = symbol.upper()
+        try:
+            for window_start in self._news_window_starts(from_date, to_date, limit):
+                articles = await self._fetch_company_news_async(symbol, window_start, to_date)
+                if len(articles) >= limit:
+                    break
+            return articles[:limit]
 
         except Exception as e:
-            print(f"⚠️ Error fetching Finnhub company news: {str(e)}")
+            logger.warning("⚠️ Error fetching Finnhub company news: %s", e)
             return None
 
+    @staticmethod
+    def _news_window_starts(from_date: str, to_date: str, limit: int) -> List[str]:
+        """
+        Start dates to try for a company-news query, narrowest first.
+
+        /company-news returns everything in the date range without paging, so the
+        range is bounded instead: start roughly limit/5 days before to_date and
+        double the window until it reaches from_date.
+        """
+        earliest, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+        days = max(2, limit // 5)
+        starts = []
+        while True:
+            window_start = max(earliest, end - timedelta(days=days))
+            starts.append(window_start.isoformat())
+            if window_start == earliest:
+                return starts
+            days *= 2
+
+    # The helpers below expect an already upper-cased symbol
+    def _company_news_params(self, symbol: str, from_date: str, to_date: str) -> Dict:
+        return {
+            "symbol": symbol,
+            "from": from_date,
+            "to": to_date,
+        }
+
+    def _fetch_company_news(self, symbol: str, from_date: str, to_date: str) -> list:
+        """Fetch (or read from cache) all company news in one date range."""
+        cache_key = FileCache.make_key("company-news", symbol=symbol, start=from_date, end=to_date)
+        cached = self.disk_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = self.session.get(
+            f"{self.BASE_URL}/company-news",
+            params=self._company_news_params(symbol, from_date, to_date),
+            timeout=10,
+        )
+        response.raise_for_status()
+
+        articles = orjson.loads(response.content) or []
+        self.disk_cache.set(cache_key, articles, self.COMPANY_NEWS_TTL)
+        return articles
+
+    async def _fetch_company_news_async(self, symbol: str, from_date: str, to_date: str) -> list:
+        """Async version of _fetch_company_news."""
+        cache_key = FileCache.make_key("company-news", symbol=symbol, start=from_date, end=to_date)
+        cached = await asyncio.to_thread(self.disk_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        response = await self.async_client.get(
+            f"{self.BASE_URL}/company-news",
+            params=self._company_news_params(symbol, from_date, to_date),
+        )
+        response.raise_for_status()
+
+        articles = orjson.loads(response.content) or []
+        await asyncio.to_thread(self.disk_cache.set, cache_key, articles, self.COMPANY_NEWS_TTL)
+        return articles
 
 # Singleton instance
 finnhub_service = FinnhubService()
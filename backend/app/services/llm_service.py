@@ -1,12 +1,18 @@
 """LLM service supporting multiple providers (OpenAI, Gemini, Claude, Proxy, Ollama)."""
-from typing import Optional, Dict, Any
-from langchain_ollama import ChatOllama
+from functools import lru_cache
+from typing import Optional, Dict, Any, AsyncIterator, Iterator
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
 from app.config import settings
 import httpx
 
 
+@lru_cache(maxsize=64)
+def _system_message(content: str) -> SystemMessage:
+    """Shared SystemMessage per prompt; agents reuse a handful of fixed system prompts."""
+    return SystemMessage(content=content)
+
+
 class LLMService:
     """Service for interacting with LLM providers."""
     
@@ -54,6 +60,9 @@ class LLMService:
     
     def _create_ollama_llm(self, model_name: str) -> BaseChatModel:
         """Create Ollama LLM connection for local open-source models."""
+        # Imported on first use; LLMService instances are cached, so this runs once per provider
+        from langchain_ollama import ChatOllama
+        
         base_url = settings.ollama_base_url or "http://localhost:11434"
         
         return ChatOllama(
@@ -67,6 +76,10 @@ class LLMService:
             top_k=40,
             top_p=0.9,
             repeat_penalty=1.1,
+            # Keep connections to the Ollama server open between agent calls
+            client_kwargs={
+                "limits": httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60),
+            },
         )
     
     def invoke(self, system_prompt: str, user_message: str) -> str:
@@ -80,23 +93,37 @@ class LLMService:
         Returns:
             LLM response as string
         """
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=user_message),
-        ]
-        
-        response = self.llm.invoke(messages)
+        response = self.llm.invoke(self._messages(system_prompt, user_message))
         return response.content
     
     async def ainvoke(self, system_prompt: str, user_message: str) -> str:
         """Async invoke the LLM with system and user messages."""
-        messages = [
-            SystemMessage(content=system_prompt),
+        response = await self.llm.ainvoke(self._messages(system_prompt, user_message))
+        return response.content
+    
+    def stream(self, system_prompt: str, user_message: str) -> Iterator[str]:
+        """
+        Invoke the LLM and yield the response text as it is generated.
+        
+        Lets callers start parsing or forwarding output on the first tokens
+        instead of waiting for the whole generation.
+        """
+        for chunk in self.llm.stream(self._messages(system_prompt, user_message)):
+            if chunk.content:
+                yield chunk.content
+    
+    async def astream(self, system_prompt: str, user_message: str) -> AsyncIterator[str]:
+        """Async version of stream."""
+        async for chunk in self.llm.astream(self._messages(system_prompt, user_message)):
+            if chunk.content:
+                yield chunk.content
+    
+    @staticmethod
+    def _messages(system_prompt: str, user_message: str) -> list:
+        return [
+            _system_message(system_prompt),
             HumanMessage(content=user_message),
         ]
-        
-        response = await self.llm.ainvoke(messages)
-        return response.content
     
     def invoke_structured(self, system_prompt: str, user_message: str, 
                          response_format: Optional[Dict[str, Any]] = None) -> str:
@@ -109,8 +136,18 @@ class LLMService:
         return self.invoke(system_prompt, user_message)
 
 
-# Global instance
-def get_llm_service(provider: Optional[str] = None) -> LLMService:
-    """Factory function to get LLM service instance."""
+# Shared instances, one per provider
+@lru_cache(maxsize=16)
+def _llm_service_for(provider: str) -> LLMService:
     return LLMService(provider)
 
+
+def get_llm_service(provider: Optional[str] = None) -> LLMService:
+    """
+    Factory function to get LLM service instance.
+    
+    Instances are shared per provider so the underlying client keeps its
+    connection pool to the model server between calls.
+    """
+    return _llm_service_for(provider or settings.default_llm_provider)
+
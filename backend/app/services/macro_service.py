@@ -1,17 +1,113 @@
 """Macroeconomic indicators service with 3-day caching."""
-import yfinance as yf
+import asyncio
+import logging
+import httpx
 import requests
-from typing import Dict, Optional
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from app.config import settings
+from app.services.cache import FileCache, DAY
+
+logger = logging.getLogger(__name__)
+
+
+# FRED series and Alpha Vantage query for each indicator; ttl follows the release cadence. With lag=None the latest value
+# is reported; otherwise the percent change against the observation `lag` periods back.
+# NOTE: FRED is only queried when FRED_API_KEY is set (its 'demo' key always returns 400); otherwise Alpha Vantage is used.
+# Get a free FRED API key from https://fred.stlouisfed.org/docs/api/api_key.html
+SERIES = {
+    'fed_rate': {
+        'label': 'Fed Rate',
+        'fred': ('FEDFUNDS', 1),
+        'alpha_vantage': {'function': 'FEDERAL_FUNDS_RATE'},
+        'lag': None,
+        'fallback': 5.25,  # Current known rate (as of 2024)
+        'ttl': 30 * DAY,  # Monthly average
+    },
+    'gdp_growth': {
+        'label': 'GDP Growth',
+        'fred': ('GDPC1', 2),  # Real GDP
+        'alpha_vantage': {'function': 'REAL_GDP', 'interval': 'annual'},
+        'lag': 1,
+        'fallback': 2.5,
+        'ttl': 90 * DAY,  # Quarterly release
+    },
+    'inflation_cpi': {
+        'label': 'CPI Inflation',
+        'fred': ('CPIAUCSL', 13),  # Consumer Price Index
+        'alpha_vantage': {'function': 'CPI', 'interval': 'monthly'},
+        'lag': 12,
+        'fallback': 3.2,
+        'ttl': 30 * DAY,  # Monthly release
+    },
+    'unemployment': {
+        'label': 'Unemployment',
+        'fred': ('UNRATE', 1),  # Unemployment Rate
+        'alpha_vantage': {'function': 'UNEMPLOYMENT'},
+        'lag': None,
+        'fallback': 3.8,
+        'ttl': 30 * DAY,  # Monthly release
+    },
+}
+
+
+def _latest_or_change(values: List[str], lag: Optional[int]) -> Optional[float]:
+    """Latest value, or its percent change vs. `lag` periods earlier; None if too few values."""
+    if len(values) < (lag or 0) + 1:
+        return None
+    current = float(values[0])
+    if lag is None:
+        return current
+    previous = float(values[lag])
+    return ((current - previous) / previous) * 100
 
 
 class MacroService:
     """Service for fetching macroeconomic indicators."""
     
+    FRED_URL = "https://api.stlouisfed.org/fred/series/observations"
+    ALPHA_VANTAGE_URL = "https://www.alphavantage.co/query"
+    VIX_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/%5EVIX"
+    VIX_CHART_PARAMS = {'interval': '1d', 'range': '1d'}
+    # Yahoo rejects requests without a browser-like User-Agent
+    YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+    
     def __init__(self):
         self.cache = {}
         self.cache_duration = timedelta(days=3)
+        # Keep-alive connections to FRED, Alpha Vantage and Yahoo, shared by the fetcher threads
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+        # Individual indicators persisted across restarts, each with its own TTL
+        self.disk_cache = FileCache("macro")
+        # Without a real key every FRED request fails, so don't spend a round-trip on it
+        self.use_fred = bool(settings.fred_api_key) and settings.fred_api_key != 'demo'
+        # Pooled client for the async path, so fetches don't tie up worker threads
+        self.async_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    
+    async def aclose(self):
+        """Close the async HTTP client's pooled connections."""
+        await self.async_client.aclose()
+    
+    def _cached_indicators(self) -> Optional[Dict]:
+        """Return cached indicators if they are younger than the cache duration."""
+        if 'macro_data' in self.cache:
+            cached_time, cached_data = self.cache['macro_data']
+            if datetime.now() - cached_time < self.cache_duration:
+                logger.debug("✓ Macro Service: Using cached data (age: %s)", datetime.now() - cached_time)
+                return cached_data
+        return None
+    
+    def _store_indicators(self, indicators: Dict) -> None:
+        """Cache freshly fetched indicators."""
+        self.cache['macro_data'] = (datetime.now(), indicators)
+        logger.debug("✓ Macro Service: Cached %d indicators", sum(v is not None for v in indicators.values()))
     
     def get_macro_indicators(self) -> Dict:
         """
@@ -20,261 +116,197 @@ class MacroService:
         Returns:
             Dictionary with VIX, fed rate, GDP, CPI, unemployment
         """
-        # Check cache
-        if 'macro_data' in self.cache:
-            cached_time, cached_data = self.cache['macro_data']
-            if datetime.now() - cached_time < self.cache_duration:
-                print(f"✓ Macro Service: Using cached data (age: {datetime.now() - cached_time})")
-                return cached_data
+        cached = self._cached_indicators()
+        if cached is not None:
+            return cached
         
-        print(f"📊 Macro Service: Fetching fresh economic indicators...")
+        logger.debug("📊 Macro Service: Fetching fresh economic indicators...")
         
-        indicators = {
-            'vix': self._get_vix(),
-            'fed_rate': self._get_fed_rate(),
-            'gdp_growth': self._get_gdp(),
-            'inflation_cpi': self._get_cpi(),
-            'unemployment': self._get_unemployment(),
+        fetchers = {
+            'vix': self._get_vix,
+            **{name: partial(self._get_indicator, name) for name in SERIES},
         }
         
-        # Cache the results
-        self.cache['macro_data'] = (datetime.now(), indicators)
-        print(f"✓ Macro Service: Cached {len([v for v in indicators.values() if v is not None])} indicators")
+        # Each fetcher is an independent network call, so run them side by side
+        with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+            futures = {name: pool.submit(fetch) for name, fetch in fetchers.items()}
+            indicators = {name: future.result() for name, future in futures.items()}
+        
+        self._store_indicators(indicators)
+        return indicators
+    
+    async def get_macro_indicators_async(self) -> Dict:
+        """
+        Async version of get_macro_indicators.
         
+        All indicator requests are awaited concurrently on the shared httpx client.
+        """
+        cached = self._cached_indicators()
+        if cached is not None:
+            return cached
+        
+        logger.debug("📊 Macro Service: Fetching fresh economic indicators...")
+        
+        vix, *values = await asyncio.gather(
+            self._get_vix_async(),
+            *(self._get_indicator_async(name) for name in SERIES),
+        )
+        indicators = {'vix': vix, **dict(zip(SERIES, values))}
+        
+        self._store_indicators(indicators)
         return indicators
     
+    def _fred_params(self, series_id: str, limit: int) -> Dict:
+        """Query parameters for the latest `limit` observations of a FRED series."""
+        return {
+            'series_id': series_id,
+            'api_key': settings.fred_api_key,
+            'file_type': 'json',
+            'limit': limit,
+            'sort_order': 'desc'
+        }
+    
+    def _alpha_vantage_params(self, query: Dict) -> Dict:
+        """Query parameters for an Alpha Vantage economic indicator."""
+        return {**query, 'apikey': settings.alpha_vantage_api_key, 'datatype': 'json'}
+    
+    def _fetch_fred_series(self, series_id: str, limit: int) -> List[str]:
+        """
+        Fetch the latest observation values of a FRED series, newest first.
+        
+        Raises on HTTP errors so callers can fall back to Alpha Vantage.
+        """
+        response = self.session.get(self.FRED_URL, params=self._fred_params(series_id, limit), timeout=10)
+        response.raise_for_status()
+        return [obs['value'] for obs in response.json().get('observations', [])]
+    
+    def _fetch_alpha_vantage(self, query: Dict) -> List[str]:
+        """Fetch an Alpha Vantage economic indicator's values, newest first."""
+        response = self.session.get(self.ALPHA_VANTAGE_URL, params=self._alpha_vantage_params(query), timeout=10)
+        response.raise_for_status()
+        return [row['value'] for row in response.json().get('data', [])]
+    
+    async def _fetch_fred_series_async(self, series_id: str, limit: int) -> List[str]:
+        """Async version of _fetch_fred_series."""
+        response = await self.async_client.get(self.FRED_URL, params=self._fred_params(series_id, limit))
+        response.raise_for_status()
+        return [obs['value'] for obs in response.json().get('observations', [])]
+    
+    async def _fetch_alpha_vantage_async(self, query: Dict) -> List[str]:
+        """Async version of _fetch_alpha_vantage."""
+        response = await self.async_client.get(self.ALPHA_VANTAGE_URL, params=self._alpha_vantage_params(query))
+        response.raise_for_status()
+        return [row['value'] for row in response.json().get('data', [])]
+    
+    @staticmethod
+    def _latest_vix_close(chart: Dict) -> Optional[float]:
+        """Latest close from a Yahoo v8 chart response (the last bar may still be null)."""
+        closes = chart['chart']['result'][0]['indicators']['quote'][0]['close']
+        latest = next((close for close in reversed(closes) if close is not None), None)
+        return float(latest) if latest is not None else None
+    
     def _get_vix(self) -> Optional[float]:
-        """Get VIX (volatility index) from yfinance."""
+        """Get VIX (volatility index) from Yahoo's chart API, cached for a day."""
+        cached = self.disk_cache.get('vix')
+        if cached is not None:
+            return cached
         try:
-            vix = yf.Ticker("^VIX")
-            data = vix.history(period="1d")
-            if not data.empty:
-                value = float(data['Close'].iloc[-1])
-                print(f"✓ VIX: {value:.2f}")
+            response = self.session.get(
+                self.VIX_CHART_URL, params=self.VIX_CHART_PARAMS, headers=self.YAHOO_HEADERS, timeout=10
+            )
+            response.raise_for_status()
+            value = self._latest_vix_close(response.json())
+            if value is not None:
+                logger.debug("✓ VIX: %.2f", value)
+                self.disk_cache.set('vix', value, DAY)
                 return value
         except Exception as e:
-            print(f"⚠️ Failed to fetch VIX: {str(e)}")
+            logger.warning("⚠️ Failed to fetch VIX: %s", e)
         return None
     
-    def _get_fed_rate(self) -> Optional[float]:
-        """
-        Get Federal Funds Rate from FRED API or Alpha Vantage fallback.
-
-        Note: FRED API 'demo' key is invalid (returns 400 error).
-        To fix: Get free FRED API key from https://fred.stlouisfed.org/docs/api/api_key.html
-        Currently relying on Alpha Vantage fallback.
-        """
+    async def _get_vix_async(self) -> Optional[float]:
+        """Async version of _get_vix."""
+        cached = await asyncio.to_thread(self.disk_cache.get, 'vix')
+        if cached is not None:
+            return cached
         try:
-            # Using FRED API (Federal Reserve Economic Data)
-            # NOTE: 'demo' key doesn't work - will trigger fallback to Alpha Vantage
-            url = "https://api.stlouisfed.org/fred/series/observations"
-            params = {
-                'series_id': 'FEDFUNDS',
-                'api_key': 'demo',  # Invalid - triggers fallback
-                'file_type': 'json',
-                'limit': 1,
-                'sort_order': 'desc'
-            }
-            response = requests.get(url, params=params, timeout=10)
+            response = await self.async_client.get(
+                self.VIX_CHART_URL, params=self.VIX_CHART_PARAMS, headers=self.YAHOO_HEADERS
+            )
             response.raise_for_status()
-            data = response.json()
-
-            if 'observations' in data and len(data['observations']) > 0:
-                value = float(data['observations'][0]['value'])
-                print(f"✓ Fed Rate (FRED): {value:.2f}%")
+            value = self._latest_vix_close(response.json())
+            if value is not None:
+                logger.debug("✓ VIX: %.2f", value)
+                await asyncio.to_thread(self.disk_cache.set, 'vix', value, DAY)
                 return value
         except Exception as e:
-            print(f"⚠️ FRED API unavailable (expected with 'demo' key): {str(e)[:100]}")
+            logger.warning("⚠️ Failed to fetch VIX: %s", e)
+        return None
+    
+    def _get_indicator(self, name: str) -> Optional[float]:
+        """
+        Get one SERIES indicator from the disk cache, FRED, Alpha Vantage, or a fixed
+        fallback, in that order. Fallback values are never cached.
+        """
+        spec = SERIES[name]
+        label, lag = spec['label'], spec['lag']
+        cached = self.disk_cache.get(name)
+        if cached is not None:
+            return cached
         
-        # Fallback: Use Alpha Vantage if configured
-        if settings.alpha_vantage_api_key:
+        if self.use_fred:
             try:
-                url = f"https://www.alphavantage.co/query"
-                params = {
-                    'function': 'FEDERAL_FUNDS_RATE',
-                    'apikey': settings.alpha_vantage_api_key,
-                    'datatype': 'json'
-                }
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                if 'data' in data and len(data['data']) > 0:
-                    value = float(data['data'][0]['value'])
-                    print(f"✓ Fed Rate (Alpha Vantage): {value:.2f}%")
+                value = _latest_or_change(self._fetch_fred_series(*spec['fred']), lag)
+                if value is not None:
+                    logger.debug("✓ %s (FRED): %.2f%%", label, value)
+                    self.disk_cache.set(name, value, spec['ttl'])
                     return value
             except Exception as e:
-                print(f"⚠️ Failed to fetch Fed rate from Alpha Vantage: {str(e)}")
+                logger.warning("⚠️ FRED API unavailable: %.100s", e)
         
-        # Final fallback: Use current known rate (as of 2024)
-        print(f"⚠️ Using fallback Fed rate: 5.25%")
-        return 5.25
-    
-    def _get_gdp(self) -> Optional[float]:
-        """
-        Get GDP growth rate from FRED API or Alpha Vantage fallback.
-
-        Note: FRED API 'demo' key is invalid. Currently relying on Alpha Vantage.
-        """
-        try:
-            # Using FRED API for GDP data
-            # NOTE: 'demo' key doesn't work - will trigger fallback
-            url = "https://api.stlouisfed.org/fred/series/observations"
-            params = {
-                'series_id': 'GDPC1',  # Real GDP
-                'api_key': 'demo',  # Invalid - triggers fallback
-                'file_type': 'json',
-                'limit': 2,
-                'sort_order': 'desc'
-            }
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'observations' in data and len(data['observations']) >= 2:
-                current = float(data['observations'][0]['value'])
-                previous = float(data['observations'][1]['value'])
-                growth = ((current - previous) / previous) * 100
-                print(f"✓ GDP Growth (FRED): {growth:.2f}%")
-                return growth
-        except Exception as e:
-            print(f"⚠️ FRED API unavailable (expected with 'demo' key): {str(e)[:100]}")
-        
-        # Fallback: Use Alpha Vantage if configured
         if settings.alpha_vantage_api_key:
             try:
-                url = f"https://www.alphavantage.co/query"
-                params = {
-                    'function': 'REAL_GDP',
-                    'interval': 'annual',
-                    'apikey': settings.alpha_vantage_api_key,
-                    'datatype': 'json'
-                }
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                if 'data' in data and len(data['data']) >= 2:
-                    current = float(data['data'][0]['value'])
-                    previous = float(data['data'][1]['value'])
-                    growth = ((current - previous) / previous) * 100
-                    print(f"✓ GDP Growth (Alpha Vantage): {growth:.2f}%")
-                    return growth
+                value = _latest_or_change(self._fetch_alpha_vantage(spec['alpha_vantage']), lag)
+                if value is not None:
+                    logger.debug("✓ %s (Alpha Vantage): %.2f%%", label, value)
+                    self.disk_cache.set(name, value, spec['ttl'])
+                    return value
             except Exception as e:
-                print(f"⚠️ Failed to fetch GDP from Alpha Vantage: {str(e)}")
+                logger.warning("⚠️ Failed to fetch %s from Alpha Vantage: %s", label, e)
         
-        # Final fallback: Use reasonable estimate
-        print(f"⚠️ Using fallback GDP growth: 2.5%")
-        return 2.5
+        logger.warning("⚠️ Using fallback %s: %s%%", label, spec['fallback'])
+        return spec['fallback']
     
-    def _get_cpi(self) -> Optional[float]:
-        """
-        Get CPI inflation from FRED API or Alpha Vantage fallback.
-
-        Note: FRED API 'demo' key is invalid. Currently relying on Alpha Vantage.
-        """
-        try:
-            # Using FRED API for CPI data
-            # NOTE: 'demo' key doesn't work - will trigger fallback
-            url = "https://api.stlouisfed.org/fred/series/observations"
-            params = {
-                'series_id': 'CPIAUCSL',  # Consumer Price Index
-                'api_key': 'demo',  # Invalid - triggers fallback
-                'file_type': 'json',
-                'limit': 13,
-                'sort_order': 'desc'
-            }
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'observations' in data and len(data['observations']) >= 13:
-                current = float(data['observations'][0]['value'])
-                year_ago = float(data['observations'][12]['value'])
-                inflation = ((current - year_ago) / year_ago) * 100
-                print(f"✓ CPI Inflation (FRED): {inflation:.2f}%")
-                return inflation
-        except Exception as e:
-            print(f"⚠️ FRED API unavailable (expected with 'demo' key): {str(e)[:100]}")
+    async def _get_indicator_async(self, name: str) -> Optional[float]:
+        """Async version of _get_indicator."""
+        spec = SERIES[name]
+        label, lag = spec['label'], spec['lag']
+        cached = await asyncio.to_thread(self.disk_cache.get, name)
+        if cached is not None:
+            return cached
         
-        # Fallback: Use Alpha Vantage if configured
-        if settings.alpha_vantage_api_key:
+        if self.use_fred:
             try:
-                url = f"https://www.alphavantage.co/query"
-                params = {
-                    'function': 'CPI',
-                    'interval': 'monthly',
-                    'apikey': settings.alpha_vantage_api_key,
-                    'datatype': 'json'
-                }
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                if 'data' in data and len(data['data']) >= 13:
-                    current = float(data['data'][0]['value'])
-                    year_ago = float(data['data'][12]['value'])
-                    inflation = ((current - year_ago) / year_ago) * 100
-                    print(f"✓ CPI Inflation (Alpha Vantage): {inflation:.2f}%")
-                    return inflation
+                value = _latest_or_change(await self._fetch_fred_series_async(*spec['fred']), lag)
+                if value is not None:
+                    logger.debug("✓ %s (FRED): %.2f%%", label, value)
+                    await asyncio.to_thread(self.disk_cache.set, name, value, spec['ttl'])
+                    return value
             except Exception as e:
-                print(f"⚠️ Failed to fetch CPI from Alpha Vantage: {str(e)}")
-        
-        # Final fallback: Use reasonable estimate
-        print(f"⚠️ Using fallback CPI inflation: 3.2%")
-        return 3.2
-    
-    def _get_unemployment(self) -> Optional[float]:
-        """
-        Get unemployment rate from FRED API or Alpha Vantage fallback.
-
-        Note: FRED API 'demo' key is invalid. Currently relying on Alpha Vantage.
-        """
-        try:
-            # Using FRED API for unemployment data
-            # NOTE: 'demo' key doesn't work - will trigger fallback
-            url = "https://api.stlouisfed.org/fred/series/observations"
-            params = {
-                'series_id': 'UNRATE',  # Unemployment Rate
-                'api_key': 'demo',  # Invalid - triggers fallback
-                'file_type': 'json',
-                'limit': 1,
-                'sort_order': 'desc'
-            }
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'observations' in data and len(data['observations']) > 0:
-                value = float(data['observations'][0]['value'])
-                print(f"✓ Unemployment (FRED): {value:.2f}%")
-                return value
-        except Exception as e:
-            print(f"⚠️ FRED API unavailable (expected with 'demo' key): {str(e)[:100]}")
+                logger.warning("⚠️ FRED API unavailable: %.100s", e)
         
-        # Fallback: Use Alpha Vantage if configured
         if settings.alpha_vantage_api_key:
             try:
-                url = f"https://www.alphavantage.co/query"
-                params = {
-                    'function': 'UNEMPLOYMENT',
-                    'apikey': settings.alpha_vantage_api_key,
-                    'datatype': 'json'
-                }
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                data = response.json()
-                
-                if 'data' in data and len(data['data']) > 0:
-                    value = float(data['data'][0]['value'])
-                    print(f"✓ Unemployment (Alpha Vantage): {value:.2f}%")
+                value = _latest_or_change(await self._fetch_alpha_vantage_async(spec['alpha_vantage']), lag)
+                if value is not None:
+                    logger.debug("✓ %s (Alpha Vantage): %.2f%%", label, value)
+                    await asyncio.to_thread(self.disk_cache.set, name, value, spec['ttl'])
                     return value
             except Exception as e:
-                print(f"⚠️ Failed to fetch unemployment from Alpha Vantage: {str(e)}")
+                logger.warning("⚠️ Failed to fetch %s from Alpha Vantage: %s", label, e)
         
-        # Final fallback: Use reasonable estimate
-        print(f"⚠️ Using fallback unemployment rate: 3.8%")
-        return 3.8
+        logger.warning("⚠️ Using fallback %s: %s%%", label, spec['fallback'])
+        return spec['fallback']
 
 
 # Global instance
@@ -1,13 +1,151 @@
 """News service for fetching recent stock-related news."""
+import asyncio
+import heapq
+import logging
+import re
+import threading
+import time
+import httpx
+import orjson
+import requests
 import yfinance as yf
-from typing import List, Dict, Tuple
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from app.config import settings
+from app.services.cache import FileCache, HOUR, DAY
+
+logger = logging.getLogger(__name__)
+
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    """One regex matching any of the keywords as a substring, so a text is scanned once."""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# Topics that make an article irrelevant to a specific stock / to overall market sentiment
+_IRRELEVANT_RE = _keyword_pattern([
+    'job posting', 'career', 'hiring', 'recruitment', 'employment',
+    'real estate', 'property', 'housing', 'mortgage',
+    'sports', 'entertainment', 'celebrity', 'gossip',
+    'weather', 'climate', 'environmental',
+    'cryptocurrency', 'bitcoin', 'crypto',
+])
+_MARKET_IRRELEVANT_RE = _keyword_pattern([
+    'job posting', 'career', 'hiring', 'recruitment',
+    'real estate', 'property', 'housing',
+    'sports', 'entertainment', 'celebrity',
+    'weather', 'climate',
+    'cryptocurrency', 'bitcoin', 'crypto',
+])
+
+# Relevance-score boosts: +3 per financial keyword, +2 per business keyword, +5 for a quality publisher
+_FINANCIAL_RE = _keyword_pattern([
+    'earnings', 'revenue', 'profit', 'financial', 'quarterly',
+    'guidance', 'forecast', 'outlook', 'analyst', 'upgrade',
+    'downgrade', 'target price', 'price target', 'stock',
+    'shares', 'trading', 'market', 'investment',
+])
+_BUSINESS_RE = _keyword_pattern([
+    'acquisition', 'merger', 'partnership', 'deal', 'agreement',
+    'launch', 'product', 'service', 'expansion', 'growth',
+    'ceo', 'executive', 'leadership', 'strategy', 'plan',
+])
+_WORD_RE = re.compile(r"\w+")
+
+# Titles whose word-shingle sets overlap at least this much (Jaccard) count as duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.7
+
+
+def _title_shingles(title: str) -> frozenset:
+    """Word 3-shingles of a lower-cased title (its words, for titles shorter than that)."""
+    words = _WORD_RE.findall(title)
+    if len(words) < 3:
+        return frozenset(words)
+    return frozenset(zip(words, words[1:], words[2:]))
+
+
+_QUALITY_PUB_RE = _keyword_pattern([
+    'reuters', 'bloomberg', 'wall street journal', 'cnbc',
+    'marketwatch', 'yahoo finance', 'seeking alpha',
+    'financial times', 'barrons', 'forbes', 'wsj',
+])
+
+
+# Publisher credibility tiers (tier 3 is everyone else)
+_TIER1_PUB_RE = _keyword_pattern([  # Premium financial news sources
+    'bloomberg', 'reuters', 'wall street journal', 'wsj',
+    'financial times', 'ft.com',
+])
+_TIER2_PUB_RE = _keyword_pattern([  # Quality business/financial sources
+    'cnbc', 'marketwatch', 'barrons', "barron's",
+    'seeking alpha', 'investor', 'forbes', 'fortune',
+])
 
 
 class NewsService:
     """Service for fetching stock-related news."""
     
+    NEWSAPI_EVERYTHING_URL = "https://newsapi.org/v2/everything"
+    COMPANY_META_TTL = 7 * DAY  # Company names and classifications practically never change
+    COMPANY_PAGE_SIZE = 100  # NewsAPI's maximum; the relevance ranking picks the best of these
+    # Developer keys allow ~100 requests a day, so identical searches (the market queries
+    # are the same for every symbol) are answered from disk for a while
+    SEARCH_TTL = 1 * HOUR
+    # For this long past SEARCH_TTL a search is answered from the cache while it is refreshed
+    # in the background, so the request that crosses the TTL doesn't wait on NewsAPI
+    SEARCH_STALE_WINDOW = 30 * 60
+    # After a 429, stop calling NewsAPI for this long and use the fallbacks instead
+    RATE_LIMIT_COOLDOWN = 1 * HOUR
+    # Market-wide news queries, and the results kept from each
+    MARKET_PAGE_SIZE = 5
+    MARKET_QUERIES = [
+        'Federal Reserve OR Fed OR interest rates OR monetary policy',
+        'inflation OR CPI OR economic data OR GDP',
+        'stock market OR S&P 500 OR NASDAQ OR Dow Jones',
+        'earnings season OR quarterly results OR corporate earnings',
+        'market volatility OR VIX OR market sentiment',
+    ]
+    
+    def __init__(self):
+        # NewsAPI searches and company names; ticker.info is a slow Yahoo scrape
+        self.disk_cache = FileCache("newsapi")
+        # Background refreshes of stale searches, one at a time per cache key
+        self.refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="newsapi-refresh")
+        self.refreshing = set()
+        self.refresh_lock = threading.Lock()
+        self.rate_limited_until = 0.0  # time.monotonic() deadline set by a 429
+        # Keep-alive connections to NewsAPI, shared by the per-query fetcher threads.
+        # Transient server errors are retried; 429s are not, since retries would spend
+        # more of the daily quota (they start the cooldown instead).
+        headers = {"X-Api-Key": settings.news_api_key} if settings.news_api_key else {}
+        retries = Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            raise_on_status=False,
+        )
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=retries))
+        # Pooled client for the async agents, so news searches don't tie up worker threads.
+        # Its transport retries failed connection attempts.
+        self.async_client = httpx.AsyncClient(
+            headers=headers,
+            timeout=10,
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                limits=httpx.Limits(max_keepalive_connections=10),
+            ),
+        )
+    
+    async def aclose(self):
+        """Close the async HTTP client's pooled connections and stop background refreshes."""
+        self.refresh_pool.shutdown(wait=False, cancel_futures=True)
+        await self.async_client.aclose()
+    
     def get_recent_news(self, symbol: str, max_articles: int = 10, days_back: int = 7) -> List[Dict]:
         """
         Fetch recent news articles for a stock symbol (7-day lookback by default).
@@ -23,16 +161,32 @@ class NewsService:
         Returns:
             List of news articles with title, snippet, url, timestamp, credibility tier
         """
-        # Try NewsAPI first if key is configured
-        if settings.news_api_key:
+        # Try NewsAPI first if key is configured (and not rate limited; yfinance then has fresher results
+        # than whatever searches are still cached)
+        if self._newsapi_available():
             try:
                 return self._get_newsapi_articles(symbol, max_articles, days_back)
             except Exception as e:
-                print(f"⚠️ NewsAPI failed: {str(e)}, falling back to yfinance")
+                logger.warning("⚠️ NewsAPI failed: %s, falling back to yfinance", e)
 
         # Fallback to yfinance
         return self._get_yfinance_news(symbol, max_articles)
     
+    async def get_recent_news_async(self, symbol: str, max_articles: int = 10, days_back: int = 7) -> List[Dict]:
+        """
+        Async version of get_recent_news.
+        
+        The NewsAPI search runs on the shared httpx client; the yfinance calls (company name
+        on a cache miss, and the fallback) have no async API and run in worker threads.
+        """
+        if self._newsapi_available():
+            try:
+                return await self._get_newsapi_articles_async(symbol, max_articles, days_back)
+            except Exception as e:
+                logger.warning("⚠️ NewsAPI failed: %s, falling back to yfinance", e)
+
+        return await asyncio.to_thread(self._get_yfinance_news, symbol, max_articles)
+    
     def get_market_news(self, max_articles: int = 5, days_back: int = 7) -> List[Dict]:
         """
         Fetch broader market news that could affect stock prices (7-day lookback).
@@ -44,92 +198,80 @@ class NewsService:
         Returns:
             List of market news articles with credibility tier
         """
-        if settings.news_api_key:
+        if self._newsapi_available():
             try:
                 return self._get_market_newsapi_articles(max_articles, days_back)
             except Exception as e:
-                print(f"⚠️ Market news NewsAPI failed: {str(e)}")
+                logger.warning("⚠️ Market news NewsAPI failed: %s", e)
+        elif settings.news_api_key:
+            return self._get_cached_market_articles(max_articles, days_back)
+
+        return []
+    
+    async def get_market_news_async(self, max_articles: int = 5, days_back: int = 7) -> List[Dict]:
+        """Async version of get_market_news using the shared httpx client."""
+        if self._newsapi_available():
+            try:
+                return await self._get_market_newsapi_articles_async(max_articles, days_back)
+            except Exception as e:
+                logger.warning("⚠️ Market news NewsAPI failed: %s", e)
+        elif settings.news_api_key:
+            return await asyncio.to_thread(self._get_cached_market_articles, max_articles, days_back)
 
         return []
     
     def _get_newsapi_articles(self, symbol: str, max_articles: int, days_back: int = 7) -> List[Dict]:
         """Fetch news from NewsAPI with 7-day lookback, improved search and credibility weighting."""
-        from newsapi import NewsApiClient
-
-        newsapi = NewsApiClient(api_key=settings.news_api_key)
-
-        # Get company name and industry for better search results
-        try:
-            ticker = yf.Ticker(symbol)
-            company_name = ticker.info.get('longName', symbol)
-            industry = ticker.info.get('industry', '')
-            sector = ticker.info.get('sector', '')
-        except:
-            company_name = symbol
-            industry = ''
-            sector = ''
-
-        # Build comprehensive search queries - start broad, then narrow
-        queries = [
-            f'"{symbol}"',  # Just the symbol - broadest search
-            f'"{company_name}"',  # Just the company name
-        ]
-
-        # Add more specific queries if we have company info
-        if company_name != symbol:
-            queries.extend([
-                f'"{symbol}" AND (earnings OR financial OR revenue OR profit OR growth OR stock OR shares)',
-                f'"{company_name}" AND (earnings OR financial OR revenue OR profit OR growth OR stock OR shares)',
-            ])
-
-        # Add industry/sector specific queries if available
-        if industry:
-            queries.append(f'"{symbol}" AND "{industry}"')
-            queries.append(f'"{company_name}" AND "{industry}"')
-        if sector:
-            queries.append(f'"{symbol}" AND "{sector}"')
-            queries.append(f'"{company_name}" AND "{sector}"')
-
-        all_articles = []
-
-        # Calculate date range (7 days back by default for trend analysis)
+        # Get company name and industry for better search results and ranking
+        company_name, industry, sector = self._company_meta(symbol)
+        raw_articles = self._search_everything(
+            self._company_query(symbol, company_name), self.COMPANY_PAGE_SIZE, self._company_from_date(days_back)
+        )
+        return self._format_company_articles(raw_articles, symbol, company_name, (industry, sector), max_articles)
+    
+    async def _get_newsapi_articles_async(self, symbol: str, max_articles: int, days_back: int = 7) -> List[Dict]:
+        """Async version of _get_newsapi_articles."""
+        company_name, industry, sector = await asyncio.to_thread(self._company_meta, symbol)
+        raw_articles = await self._search_everything_async(
+            self._company_query(symbol, company_name), self.COMPANY_PAGE_SIZE, self._company_from_date(days_back)
+        )
+        return self._format_company_articles(raw_articles, symbol, company_name, (industry, sector), max_articles)
+    
+    @staticmethod
+    def _company_query(symbol: str, company_name: str) -> str:
+        """
+        One search for either name. Narrower variants (financial terms, industry, sector) only ever
+        returned subsets of it, so ranking the union locally (with those terms as score boosts)
+        is cheaper than querying each.
+        """
+        return f'"{symbol}"' if company_name == symbol else f'"{symbol}" OR "{company_name}"'
+    
+    @staticmethod
+    def _company_from_date(days_back: int) -> datetime:
+        """Start of the company-news date range (7 days back by default for trend analysis)."""
         from_date = (datetime.now() - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
-        print(f"📅 NewsAPI: Fetching articles from past {days_back} days (since {from_date.strftime('%Y-%m-%d')})")
-
-        # Try multiple queries to get diverse, relevant articles
-        for i, query in enumerate(queries):
-            try:
-                print(f"🔍 NewsAPI: Trying query {i+1}/{len(queries)}: {query}")
-                response = newsapi.get_everything(
-                    q=query,
-                    language='en',
-                    sort_by='publishedAt',
-                    page_size=min(max_articles, 20),  # Get more to filter
-                    from_param=from_date.isoformat(),
-                )
-                
-                raw_articles = response.get('articles', [])
-                print(f"📰 NewsAPI: Query returned {len(raw_articles)} raw articles")
-                
-                relevant_count = 0
-                for article in raw_articles:
-                    if self._is_relevant_article(article, symbol, company_name):
-                        all_articles.append(article)
-                        relevant_count += 1
-                
-                print(f"✅ NewsAPI: Query {i+1} found {relevant_count} relevant articles")
-                        
-            except Exception as e:
-                print(f"⚠️ Query failed: {query} - {str(e)}")
-                continue
+        logger.debug("📅 NewsAPI: Fetching articles from past %d days (since %s)", days_back, from_date.date())
+        return from_date
+    
+    def _format_company_articles(
+        self, raw_articles: List[Dict], symbol: str, company_name: str, topics: Tuple[str, ...], max_articles: int
+    ) -> List[Dict]:
+        """Filter, deduplicate, rank and format company search results."""
+        all_articles = [
+            article for article in raw_articles
+            if self._is_relevant_article(article, symbol, company_name)
+        ]
+        logger.debug("✅ NewsAPI: Search found %d/%d relevant articles", len(all_articles), len(raw_articles))
         
         # Remove duplicates and sort by relevance
         unique_articles = self._deduplicate_articles(all_articles)
-        filtered_articles = self._filter_and_rank_articles(unique_articles, symbol, company_name)
+        filtered_articles = self._filter_and_rank_articles(
+            unique_articles, symbol, company_name, max_articles, topics
+        )
         
         # Format articles with credibility tier
         articles = []
-        for article in filtered_articles[:max_articles]:
+        for article in filtered_articles:
             publisher = article.get('source', {}).get('name', 'Unknown')
             credibility_tier, credibility_weight = self._get_publisher_credibility(publisher)
 
@@ -144,52 +286,7 @@ class NewsService:
                 'credibility_weight': credibility_weight,
             })
         
-        # If we don't have enough articles, try a more permissive approach
-        if len(articles) < max_articles // 2:  # If we have less than half the requested articles
-            print(f"⚠️ NewsAPI: Only found {len(articles)} articles, trying broader search...")
-            try:
-                # Try a very broad search without financial keywords
-                broad_response = newsapi.get_everything(
-                    q=f'"{symbol}" OR "{company_name}"',
-                    language='en',
-                    sort_by='publishedAt',
-                    page_size=max_articles * 2,
-                    from_param=from_date.isoformat(),
-                )
-                
-                broad_articles = []
-                for article in broad_response.get('articles', []):
-                    if self._is_relevant_article(article, symbol, company_name):
-                        broad_articles.append(article)
-                
-                if broad_articles:
-                    broad_unique = self._deduplicate_articles(broad_articles)
-                    broad_filtered = self._filter_and_rank_articles(broad_unique, symbol, company_name)
-                    
-                    # Add to existing articles with credibility
-                    for article in broad_filtered:
-                        if len(articles) >= max_articles:
-                            break
-                        publisher = article.get('source', {}).get('name', 'Unknown')
-                        credibility_tier, credibility_weight = self._get_publisher_credibility(publisher)
-
-                        articles.append({
-                            'type': 'news',
-                            'title': article.get('title', ''),
-                            'url': article.get('url', ''),
-                            'snippet': article.get('description', '') or article.get('title', ''),
-                            'publisher': publisher,
-                            'timestamp': article.get('publishedAt', datetime.now().isoformat()),
-                            'credibility_tier': credibility_tier,
-                            'credibility_weight': credibility_weight,
-                        })
-                    
-                    print(f"✓ NewsAPI: Broad search added {len(articles)} total articles for {symbol}")
-                
-            except Exception as e:
-                print(f"⚠️ Broad search failed: {str(e)}")
-        
-        print(f"✓ NewsAPI: Fetched {len(articles)} relevant articles for {symbol}")
+        logger.debug("✓ NewsAPI: Fetched %d relevant articles for %s", len(articles), symbol)
         return articles
     
     def _get_yfinance_news(self, symbol: str, max_articles: int) -> List[Dict]:
@@ -210,47 +307,44 @@ class NewsService:
                 ).isoformat()
             })
         
-        print(f"✓ yfinance: Fetched {len(articles)} articles for {symbol}")
+        logger.debug("✓ yfinance: Fetched %d articles for %s", len(articles), symbol)
         return articles
     
     def _get_market_newsapi_articles(self, max_articles: int, days_back: int = 7) -> List[Dict]:
         """Fetch broader market news that could affect stock prices (7-day lookback)."""
-        from newsapi import NewsApiClient
-
-        newsapi = NewsApiClient(api_key=settings.news_api_key)
-
-        # Market-wide news queries
-        market_queries = [
-            'Federal Reserve OR Fed OR interest rates OR monetary policy',
-            'inflation OR CPI OR economic data OR GDP',
-            'stock market OR S&P 500 OR NASDAQ OR Dow Jones',
-            'earnings season OR quarterly results OR corporate earnings',
-            'market volatility OR VIX OR market sentiment',
-        ]
-
-        all_articles = []
-
-        # Calculate date range
+        from_date = self._market_from_date(days_back)
+        results = self._search_everything_many(self.MARKET_QUERIES, self.MARKET_PAGE_SIZE, from_date)
+        return self._format_market_articles(results, max_articles)
+    
+    async def _get_market_newsapi_articles_async(self, max_articles: int, days_back: int = 7) -> List[Dict]:
+        """Async version of _get_market_newsapi_articles."""
+        from_date = self._market_from_date(days_back)
+        results = await self._search_everything_many_async(self.MARKET_QUERIES, self.MARKET_PAGE_SIZE, from_date)
+        return self._format_market_articles(results, max_articles)
+    
+    def _get_cached_market_articles(self, max_articles: int, days_back: int = 7) -> List[Dict]:
+        """Market news from the searches still cached, used while NewsAPI is rate limited."""
+        from_date = self._market_from_date(days_back)
+        results = []
+        for query in self.MARKET_QUERIES:
+            params = self._everything_params(query, self.MARKET_PAGE_SIZE, from_date)
+            results.append(self._cached_search(params, FileCache.make_key("everything", **params)) or [])
+        return self._format_market_articles(results, max_articles)
+    
+    @staticmethod
+    def _market_from_date(days_back: int) -> datetime:
+        """Start of the market-news date range."""
         from_date = (datetime.now() - timedelta(days=days_back)).replace(hour=0, minute=0, second=0, microsecond=0)
-        print(f"📅 NewsAPI Market: Fetching market articles from past {days_back} days")
-
-        for query in market_queries:
-            try:
-                response = newsapi.get_everything(
-                    q=query,
-                    language='en',
-                    sort_by='publishedAt',
-                    page_size=5,  # Fewer per query
-                    from_param=from_date.isoformat(),
-                )
-                
-                for article in response.get('articles', []):
-                    if self._is_market_relevant_article(article):
-                        all_articles.append(article)
-                        
-            except Exception as e:
-                print(f"⚠️ Market query failed: {query} - {str(e)}")
-                continue
+        logger.debug("📅 NewsAPI Market: Fetching market articles from past %d days", days_back)
+        return from_date
+    
+    def _format_market_articles(self, results: List[List[Dict]], max_articles: int) -> List[Dict]:
+        """Filter, deduplicate and format the per-query market search results."""
+        all_articles = []
+        for raw_articles in results:
+            for article in raw_articles:
+                if self._is_market_relevant_article(article):
+                    all_articles.append(article)
         
         # Remove duplicates and format with credibility
         unique_articles = self._deduplicate_articles(all_articles)
@@ -271,9 +365,155 @@ class NewsService:
                 'credibility_weight': credibility_weight,
             })
         
-        print(f"✓ NewsAPI: Fetched {len(articles)} market news articles")
+        logger.debug("✓ NewsAPI: Fetched %d market news articles", len(articles))
         return articles
     
+    def _company_meta(self, symbol: str) -> Tuple[str, str, str]:
+        """
+        (company_name, industry, sector) for a symbol, cached on disk for COMPANY_META_TTL.
+        
+        Unknown fields are '' (the name falls back to the symbol itself).
+        """
+        cache_key = FileCache.make_key("company-meta", symbol=symbol)
+        cached = self.disk_cache.get(cache_key)
+        if cached is not None:
+            return tuple(cached)
+        
+        try:
+            info = yf.Ticker(symbol).info
+            meta = (info.get('longName') or symbol, info.get('industry') or '', info.get('sector') or '')
+        except Exception:
+            # Not cached, so the next request retries the lookup
+            return (symbol, '', '')
+        
+        self.disk_cache.set(cache_key, list(meta), self.COMPANY_META_TTL)
+        return meta
+    
+    @staticmethod
+    def _everything_params(query: str, page_size: int, from_date: datetime) -> Dict:
+        """Query parameters for a NewsAPI /everything search, newest first."""
+        return {
+            'q': query,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': page_size,
+            'from': from_date.isoformat(),
+        }
+    
+    def _newsapi_available(self) -> bool:
+        """True if a NewsAPI key is configured and we are not backing off after a 429."""
+        return bool(settings.news_api_key) and time.monotonic() >= self.rate_limited_until
+    
+    def _checked_articles(self, status_code: int, payload: Dict, cache_key: str) -> List[Dict]:
+        """
+        Articles from a NewsAPI search response, caching successful ones.
+        
+        A 429 starts the rate-limit cooldown; any error status raises.
+        """
+        if status_code == 429:
+            self.rate_limited_until = time.monotonic() + self.RATE_LIMIT_COOLDOWN
+            logger.warning("⚠️ NewsAPI rate limit hit, pausing NewsAPI for %d minutes", self.RATE_LIMIT_COOLDOWN // 60)
+        if status_code != 200:
+            raise RuntimeError(f"NewsAPI error {status_code}: {payload.get('message', '')}")
+        articles = payload.get('articles', [])
+        self.disk_cache.set(cache_key, articles, self.SEARCH_TTL)
+        return articles
+    
+    def _cached_search(self, params: Dict, cache_key: str) -> Optional[List[Dict]]:
+        """
+        Cached articles for a search, or None on a miss.
+        
+        A search less than SEARCH_STALE_WINDOW past its TTL is returned as is and
+        refreshed in the background (stale-while-revalidate).
+        """
+        cached = self.disk_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        stale = self.disk_cache.get(cache_key, max_stale=self.SEARCH_STALE_WINDOW)
+        if stale is not None and self._newsapi_available():
+            with self.refresh_lock:
+                start_refresh = cache_key not in self.refreshing
+                self.refreshing.add(cache_key)
+            if start_refresh:
+                self.refresh_pool.submit(self._refresh_search, params, cache_key)
+        return stale
+    
+    def _refresh_search(self, params: Dict, cache_key: str) -> None:
+        """Re-run a stale search and update its cache entry."""
+        try:
+            self._fetch_everything(params, cache_key)
+        except Exception as e:
+            logger.debug("⚠️ NewsAPI background refresh failed: %s", e)
+        finally:
+            with self.refresh_lock:
+                self.refreshing.discard(cache_key)
+    
+    def _fetch_everything(self, params: Dict, cache_key: str) -> List[Dict]:
+        """Call /everything with prepared params and cache the articles."""
+        response = self.session.get(self.NEWSAPI_EVERYTHING_URL, params=params, timeout=10)
+        return self._checked_articles(response.status_code, orjson.loads(response.content), cache_key)
+    
+    def _search_everything(self, query: str, page_size: int, from_date: datetime) -> List[Dict]:
+        """Run one NewsAPI /everything search, newest first. Raises on errors and while rate limited."""
+        params = self._everything_params(query, page_size, from_date)
+        cache_key = FileCache.make_key("everything", **params)
+        cached = self._cached_search(params, cache_key)
+        if cached is not None:
+            return cached
+        if not self._newsapi_available():
+            raise RuntimeError("NewsAPI rate limited")
+        
+        return self._fetch_everything(params, cache_key)
+    
+    async def _search_everything_async(self, query: str, page_size: int, from_date: datetime) -> List[Dict]:
+        """
+        Async version of _search_everything.
+        
+        The disk cache reads and writes (file I/O plus JSON) run in worker threads, off the event loop.
+        """
+        params = self._everything_params(query, page_size, from_date)
+        cache_key = FileCache.make_key("everything", **params)
+        cached = await asyncio.to_thread(self._cached_search, params, cache_key)
+        if cached is not None:
+            return cached
+        if not self._newsapi_available():
+            raise RuntimeError("NewsAPI rate limited")
+        
+        response = await self.async_client.get(self.NEWSAPI_EVERYTHING_URL, params=params)
+        return await asyncio.to_thread(
+            self._checked_articles, response.status_code, orjson.loads(response.content), cache_key
+        )
+    
+    def _search_everything_many(self, queries: List[str], page_size: int, from_date: datetime) -> List[List[Dict]]:
+        """
+        Run several NewsAPI searches concurrently; results are in query order.
+        
+        A failed query contributes an empty list so the others still count.
+        """
+        def search(query: str) -> List[Dict]:
+            try:
+                return self._search_everything(query, page_size, from_date)
+            except Exception as e:
+                logger.warning("⚠️ Query failed: %s - %s", query, e)
+                return []
+        
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            return list(pool.map(search, queries))
+    
+    async def _search_everything_many_async(
+        self, queries: List[str], page_size: int, from_date: datetime
+    ) -> List[List[Dict]]:
+        """Async version of _search_everything_many, with the searches gathered on one client."""
+        async def search(query: str) -> List[Dict]:
+            try:
+                return await self._search_everything_async(query, page_size, from_date)
+            except Exception as e:
+                logger.warning("⚠️ Query failed: %s - %s", query, e)
+                return []
+        
+        return await asyncio.gather(*(search(query) for query in queries))
+    
     def _is_relevant_article(self, article: Dict, symbol: str, company_name: str) -> bool:
         """Check if article is relevant to the specific stock."""
         title = article.get('title') or ''
@@ -285,17 +525,8 @@ class NewsService:
             return False
         
         # Exclude clearly irrelevant content
-        irrelevant_keywords = [
-            'job posting', 'career', 'hiring', 'recruitment', 'employment',
-            'real estate', 'property', 'housing', 'mortgage',
-            'sports', 'entertainment', 'celebrity', 'gossip',
-            'weather', 'climate', 'environmental',
-            'cryptocurrency', 'bitcoin', 'crypto',
-        ]
-        
-        for keyword in irrelevant_keywords:
-            if keyword in content:
-                return False
+        if _IRRELEVANT_RE.search(content):
+            return False
         
         # Accept articles that mention the company, even without specific financial terms
         # This includes business news, product launches, partnerships, etc.
@@ -308,97 +539,89 @@ class NewsService:
         content = f"{title} {description}".lower()
         
         # Exclude irrelevant content
-        irrelevant_keywords = [
-            'job posting', 'career', 'hiring', 'recruitment',
-            'real estate', 'property', 'housing',
-            'sports', 'entertainment', 'celebrity',
-            'weather', 'climate',
-            'cryptocurrency', 'bitcoin', 'crypto',
-        ]
-        
-        for keyword in irrelevant_keywords:
-            if keyword in content:
-                return False
-        
-        return True
+        return not _MARKET_IRRELEVANT_RE.search(content)
     
     def _deduplicate_articles(self, articles: List[Dict]) -> List[Dict]:
-        """Remove duplicate articles based on title similarity."""
+        """
+        Remove duplicate articles based on title similarity.
+        
+        Besides exact repeats this drops near-duplicates, e.g. the same wire story
+        syndicated with a publisher suffix or slightly reworded.
+        """
         unique_articles = []
         seen_titles = set()
+        seen_shingles = []
         
         for article in articles:
-            title = article.get('title', '').lower().strip()
-            if title and title not in seen_titles:
-                seen_titles.add(title)
-                unique_articles.append(article)
+            title = (article.get('title') or '').lower().strip()
+            if not title or title in seen_titles:
+                continue
+            shingles = _title_shingles(title)
+            if any(
+                len(shingles & seen) >= NEAR_DUPLICATE_THRESHOLD * len(shingles | seen)
+                for seen in seen_shingles
+            ):
+                continue
+            seen_titles.add(title)
+            seen_shingles.append(shingles)
+            unique_articles.append(article)
         
         return unique_articles
     
-    def _filter_and_rank_articles(self, articles: List[Dict], symbol: str, company_name: str) -> List[Dict]:
-        """Filter and rank articles by relevance and quality."""
+    def _filter_and_rank_articles(
+        self, articles: List[Dict], symbol: str, company_name: str, limit: int, topics: Tuple[str, ...] = ()
+    ) -> List[Dict]:
+        """
+        Return the `limit` most relevant articles, best first, ranked by relevance and quality.
+        
+        topics are extra phrases (the company's industry and sector) that boost an article's score.
+        """
+        symbol_lower = symbol.lower()
+        company_lower = company_name.lower()
+        topics_lower = [topic.lower() for topic in topics if topic]
+        # One reference time for the whole batch, so every article's recency is measured alike
+        now = datetime.now(timezone.utc)
+        
         def relevance_score(article):
-            title = article.get('title', '').lower()
-            description = article.get('description', '').lower()
+            title = (article.get('title') or '').lower()
+            description = (article.get('description') or '').lower()
             content = f"{title} {description}"
             
             score = 0
             
             # Higher score for direct mentions in title
-            if symbol.lower() in title:
+            if symbol_lower in title:
                 score += 15
-            if company_name.lower() in title:
+            if company_lower in title:
                 score += 12
             
             # Mentions in description
-            if symbol.lower() in description:
+            if symbol_lower in description:
                 score += 8
-            if company_name.lower() in description:
+            if company_lower in description:
                 score += 6
             
-            # Financial keywords boost score significantly
-            financial_keywords = [
-                'earnings', 'revenue', 'profit', 'financial', 'quarterly',
-                'guidance', 'forecast', 'outlook', 'analyst', 'upgrade',
-                'downgrade', 'target price', 'price target', 'stock',
-                'shares', 'trading', 'market', 'investment'
-            ]
-            
-            for keyword in financial_keywords:
-                if keyword in content:
-                    score += 3
-            
-            # Business keywords also boost score
-            business_keywords = [
-                'acquisition', 'merger', 'partnership', 'deal', 'agreement',
-                'launch', 'product', 'service', 'expansion', 'growth',
-                'ceo', 'executive', 'leadership', 'strategy', 'plan'
-            ]
+            # Financial keywords boost score significantly, business keywords less so.
+            # Each distinct keyword counts once, however often it appears.
+            score += 3 * len(set(_FINANCIAL_RE.findall(content)))
+            score += 2 * len(set(_BUSINESS_RE.findall(content)))
             
-            for keyword in business_keywords:
-                if keyword in content:
-                    score += 2
+            # Industry/sector coverage (these used to be separate NewsAPI queries)
+            score += 3 * sum(topic in content for topic in topics_lower)
             
             # Quality publishers get higher scores
-            publisher = article.get('source', {}).get('name', '').lower()
-            quality_publishers = [
-                'reuters', 'bloomberg', 'wall street journal', 'cnbc',
-                'marketwatch', 'yahoo finance', 'seeking alpha',
-                'financial times', 'barrons', 'forbes', 'wsj'
-            ]
-            
-            for pub in quality_publishers:
-                if pub in publisher:
-                    score += 5
-                    break
+            publisher = ((article.get('source') or {}).get('name') or '').lower()
+            if _QUALITY_PUB_RE.search(publisher):
+                score += 5
             
             # Recency bonus (articles from today get higher score)
             try:
-                from datetime import datetime, timedelta
                 published = article.get('publishedAt', '')
                 if published:
-                    pub_date = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                    hours_ago = (datetime.now(pub_date.tzinfo) - pub_date).total_seconds() / 3600
+                    pub_date = datetime.fromisoformat(published)
+                    if pub_date.tzinfo is None:  # Naive timestamps are local time
+                        pub_date = pub_date.astimezone()
+                    hours_ago = (now - pub_date).total_seconds() / 3600
                     if hours_ago < 24:  # Within 24 hours
                         score += 5
                     elif hours_ago < 168:  # Within a week
@@ -408,8 +631,8 @@ class NewsService:
             
             return score
         
-        # Sort by relevance score
-        return sorted(articles, key=relevance_score, reverse=True)
+        # Only the top few are used, so a partial sort is enough (ties keep their original order)
+        return heapq.nlargest(limit, articles, key=relevance_score)
 
     def _get_publisher_credibility(self, publisher: str) -> Tuple[int, float]:
         """
@@ -423,23 +646,10 @@ class NewsService:
         """
         publisher_lower = publisher.lower()
 
-        # Tier 1: Premium financial news sources
-        tier1_publishers = [
-            'bloomberg', 'reuters', 'wall street journal', 'wsj',
-            'financial times', 'ft.com'
-        ]
-        for pub in tier1_publishers:
-            if pub in publisher_lower:
-                return (1, 1.0)
-
-        # Tier 2: Quality business/financial sources
-        tier2_publishers = [
-            'cnbc', 'marketwatch', 'barrons', "barron's",
-            'seeking alpha', 'investor', 'forbes', 'fortune'
-        ]
-        for pub in tier2_publishers:
-            if pub in publisher_lower:
-                return (2, 0.75)
+        if _TIER1_PUB_RE.search(publisher_lower):
+            return (1, 1.0)
+        if _TIER2_PUB_RE.search(publisher_lower):
+            return (2, 0.75)
 
         # Tier 3: All other sources
         return (3, 0.5)
@@ -68,7 +68,9 @@ class PatternRecognitionService:
             lookback_periods: Number of periods to look back for pattern detection
 
         Returns:
-            List of detected patterns
+            List of detected patterns, in detection order (unsorted). Callers
+            that only need the strongest few should use heapq.nlargest on
+            confidence rather than sorting the full list.
         """
         patterns = []
 
@@ -88,9 +90,6 @@ class PatternRecognitionService:
         ma_patterns = self._detect_ma_patterns(df)
         patterns.extend(ma_patterns)
 
-        # Sort by confidence
-        patterns.sort(key=lambda x: x.confidence, reverse=True)
-
         return patterns
 
     def _detect_candlestick_patterns(self, df: pd.DataFrame) -> List[Pattern]:
@@ -2,6 +2,7 @@
 """Test script for enhanced technical analysis system."""
 
 import asyncio
+import heapq
 import json
 from pprint import pprint
 from app.services.stock_data import stock_data_service
@@ -111,7 +112,7 @@ def test_pattern_recognition():
     patterns = pattern_service.detect_all_patterns(df, lookback_periods=50)
 
     print(f"\n🔍 Patterns Detected: {len(patterns)}")
-    for i, pattern in enumerate(patterns[:5], 1):
+    for i, pattern in enumerate(heapq.nlargest(5, patterns, key=lambda p: p.confidence), 1):
         print(f"\n{i}. {pattern.pattern_type.value.replace('_', ' ').title()}")
         print(f"   - Confidence: {pattern.confidence:.1%}")
         print(f"   - Signal: {pattern.signal}")
@@ -0,0 +1,43 @@
+"""Test NewsAPI article ranking."""
+import sys
+
+from app.services.news_service import news_service
+
+
+def test_rank_articles_with_null_fields():
+    """NewsAPI often sends "description": null; ranking must not fail on it."""
+    print("Testing article ranking with null fields...")
+    print("=" * 50)
+
+    articles = [
+        {
+            "title": "Apple shares rise after earnings beat",
+            "description": None,
+            "source": {"name": "Reuters"},
+            "publishedAt": "2025-01-02T10:00:00Z",
+        },
+        {
+            "title": None,
+            "description": "AAPL revenue outlook raised",
+            "source": {"name": None},
+            "publishedAt": None,
+        },
+    ]
+
+    try:
+        ranked = news_service._filter_and_rank_articles(articles, "AAPL", "Apple", limit=2)
+    except Exception as e:
+        print(f"❌ Ranking failed: {e}")
+        return False
+
+    if len(ranked) != 2 or ranked[0] is not articles[0]:
+        print(f"❌ Unexpected ranking: {ranked}")
+        return False
+
+    print("✅ Articles with null fields ranked")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_rank_articles_with_null_fields()
+    sys.exit(0 if success else 1)
@@ -45,18 +45,23 @@ export class StockAnalysisAPI {
 
       this.ws.onmessage = (event) => {
         try {
-          const update: AgentUpdate = JSON.parse(event.data);
+          const parsed: AgentUpdate | AgentUpdate[] = JSON.parse(event.data);
           console.log("🔄 WebSocket RAW message:", event.data);
-          console.log("🔄 WebSocket PARSED update:", update);
-
-          // If it's the final result with data
-          if (update.status === "completed" && update.data) {
-            console.log("✅ Analysis complete, calling onComplete with:", update.data);
-            onComplete(update.data);
-          } else {
-            // Regular agent update - log the status mapping
-            console.log(`📡 Agent update: ${update.agent} -> ${update.status} (${update.message})`);
-            onUpdate(update);
+
+          // The backend may coalesce several updates into one frame
+          const updates = Array.isArray(parsed) ? parsed : [parsed];
+          for (const update of updates) {
+            console.log("🔄 WebSocket PARSED update:", update);
+
+            // If it's the final result with data
+            if (update.status === "completed" && update.data) {
+              console.log("✅ Analysis complete, calling onComplete with:", update.data);
+              onComplete(update.data);
+            } else {
+              // Regular agent update - log the status mapping
+              console.log(`📡 Agent update: ${update.agent} -> ${update.status} (${update.message})`);
+              onUpdate(update);
+            }
           }
         } catch (err) {
           console.error("❌ Error parsing WebSocket message:", err, "Raw data:", event.data);